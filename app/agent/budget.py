@@ -0,0 +1,83 @@
+"""
+Per-turn budgets for the ReAct loop – model calls, wall-clock time and tokens.
+
+One TurnBudget lives for one chat turn and is passed to the graph through
+``config["configurable"]["budget"]``.  The agent node checks it before every
+model call; once a limit is reached the turn ends with a final answer
+instead of another tool round:
+
+  iterations – one more model call with tool use disabled, asking for the
+               best answer from what has been gathered so far
+  deadline   – a fixed apology; in-flight model and tool calls are cut off
+  tokens     – a fixed apology, since any further call would exceed it
+
+A limit of 0 disables that budget.
+"""
+from __future__ import annotations
+
+import time
+
+FINAL_ANSWER_INSTRUCTION = (
+    "You have used all the tool calls available for this request. Do not call "
+    "any more tools. Answer the customer now using only the information already "
+    "gathered above; if something is still unknown, say so briefly and suggest "
+    "how they can follow up."
+)
+
+FALLBACK_ANSWERS = {
+    # Only used if the final tool-less call still did not end the turn
+    "iterations": (
+        "Sorry – I couldn't finish looking this up. Could you rephrase or "
+        "narrow the question a little?"
+    ),
+    "deadline": (
+        "Sorry – this is taking longer than it should, so I've stopped here. "
+        "Could you try again, or ask a more specific question?"
+    ),
+    "tokens": (
+        "Sorry – this request needed more work than I can do in one go. "
+        "Could you narrow it down a little?"
+    ),
+}
+
+
+class TurnBudget:
+    """Limits and running totals for one chat turn."""
+
+    def __init__(self, max_iterations: int = 0, deadline: float = 0.0, max_tokens: int = 0):
+        self.max_iterations = max_iterations
+        self.max_tokens = max_tokens
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline if deadline > 0 else None
+        self.iterations = 0
+        self.tokens = 0
+        # Which budget ended the turn, and the fixed answer sent for it (if any)
+        self.exhausted: str | None = None
+        self.fallback: str | None = None
+
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self) -> str | None:
+        """Name of the first exhausted budget, or None if another model call is allowed."""
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        if self.max_tokens and self.tokens >= self.max_tokens:
+            return "tokens"
+        if self.max_iterations and self.iterations >= self.max_iterations:
+            return "iterations"
+        return None
+
+    def exhaust(self, reason: str) -> str | None:
+        """Record ``reason`` as the end of the turn; returns its fixed answer.
+
+        None means the agent should make its final tool-less call instead
+        (iterations, the first time only).
+        """
+        final_call = reason == "iterations" and self.exhausted != reason
+        self.exhausted = reason
+        self.fallback = None if final_call else FALLBACK_ANSWERS[reason]
+        return self.fallback
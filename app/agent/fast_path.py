@@ -0,0 +1,172 @@
+"""
+Deterministic fast path for trivial intents – bypasses the ReAct loop.
+
+Messages such as "show me PROD003", "compare PROD001 and PROD004" or
+"cancel BK3A7F2C1D" name both the tool and its arguments, yet going through
+the agent costs at least two LLM round-trips.  Here they are matched with a
+strict pattern, the tool is called directly and the reply is rendered from a
+template.
+
+Matching is deliberately conservative: apart from the IDs, every word must
+come from a small vocabulary for that intent.  Anything else – extra
+questions, conditions, unknown IDs, tool errors – returns None and the
+message goes to the agent as usual.
+"""
+from __future__ import annotations
+
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+_PRODUCT_ID_RE = re.compile(r"\bprod\d{3}\b", re.IGNORECASE)
+_BOOKING_ID_RE = re.compile(r"\bbk[0-9a-f]{8}\b", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z']+")
+
+_FILLER = {"please", "pls", "can", "could", "you", "i", "want", "to", "would", "like", "the", "a", "me", "my"}
+
+_DETAILS_WORDS = _FILLER | {
+    "show", "tell", "about", "details", "detail", "of", "for", "on", "product",
+    "info", "information", "more", "what", "is", "get", "specs", "view", "give",
+}
+_COMPARE_WORDS = _FILLER | {
+    "compare", "comparison", "vs", "versus", "and", "with", "between",
+    "difference", "products", "show", "of",
+}
+_COMPARE_TRIGGERS = {"compare", "comparison", "vs", "versus", "difference"}
+_CANCEL_WORDS = _FILLER | {"cancel", "booking", "appointment", "reservation", "id", "with", "for"}
+
+
+@dataclass
+class FastPathTurn:
+    """Everything the router needs to answer a matched message."""
+
+    tool_name: str
+    tool_args: dict
+    tool_output: str
+    answer: str
+    trace: dict
+    messages: list[BaseMessage] = field(default_factory=list)
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def match_fast_path(message: str) -> tuple[str, dict] | None:
+    """Return ``(tool_name, tool_args)`` if ``message`` is an unambiguous
+    trivial request, else None."""
+    products = list(dict.fromkeys(p.upper() for p in _PRODUCT_ID_RE.findall(message)))
+    bookings = list(dict.fromkeys(b.upper() for b in _BOOKING_ID_RE.findall(message)))
+    rest = _words(_BOOKING_ID_RE.sub(" ", _PRODUCT_ID_RE.sub(" ", message)))
+
+    if bookings and products:
+        return None
+
+    if len(bookings) == 1 and "cancel" in rest and rest <= _CANCEL_WORDS:
+        return "cancel_appointment", {"booking_id": bookings[0]}
+
+    if len(products) >= 2 and rest & _COMPARE_TRIGGERS and rest <= _COMPARE_WORDS:
+        return "compare_products", {"product_ids": products}
+
+    if len(products) == 1 and rest <= _DETAILS_WORDS:
+        return "get_product_details", {"product_id": products[0]}
+
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Templates
+# ---------------------------------------------------------------------------
+
+def _render_details(p: dict) -> str:
+    specs = ", ".join(f"{k.replace('_', ' ')}: {v}" for k, v in list(p.get("specs", {}).items())[:4])
+    stock = f"{p['stock']} in stock" if p.get("stock") else "currently out of stock"
+    return (
+        f"**{p['name']}** ({p['brand']}, {p['category']}) is ${p['price']:,.2f} and rated "
+        f"{p['rating']}/5 – {stock}. {p['description']}\n\n"
+        f"Key specs – {specs}.\n\n"
+        "Would you like to compare it with another product or book a demo?"
+    )
+
+
+def _render_comparison(result: dict) -> str:
+    lines = [
+        f"- **{p['name']}** ({p['id']}): ${p['price']:,.2f}, rated {p['rating']}/5"
+        for p in result["products"]
+    ]
+    cheapest = min(result["products"], key=lambda p: p["price"])
+    best = max(result["products"], key=lambda p: p["rating"])
+    summary = f"{cheapest['name']} is the most affordable"
+    summary += (
+        " and also the best rated." if best is cheapest else f", while {best['name']} is the best rated."
+    )
+    return (
+        "Here's a side-by-side look:\n"
+        + "\n".join(lines)
+        + f"\n\n{summary} Want the full spec-by-spec breakdown for any of them?"
+    )
+
+
+def _render_cancellation(result: dict) -> str:
+    return f"Done – {result['message']} {result['refund_policy']} Is there anything else I can help with?"
+
+
+_RENDERERS = {
+    "get_product_details": _render_details,
+    "compare_products": _render_comparison,
+    "cancel_appointment": _render_cancellation,
+}
+
+
+def _tool(name: str):
+    from app.agent.tools.calendar_tools import cancel_appointment
+    from app.agent.tools.catalog_tools import compare_products, get_product_details
+
+    return {
+        "get_product_details": get_product_details,
+        "compare_products": compare_products,
+        "cancel_appointment": cancel_appointment,
+    }[name]
+
+
+async def try_fast_path(message: str) -> FastPathTurn | None:
+    """Answer ``message`` without the LLM if it is a trivial request.
+
+    Returns None when the message does not match or the tool reports an
+    error; the caller then runs the agent as usual.
+    """
+    matched = match_fast_path(message)
+    if matched is None:
+        return None
+    tool_name, tool_args = matched
+
+    result = await _tool(tool_name).ainvoke(tool_args)
+    if not isinstance(result, dict) or "error" in result or result.get("not_found"):
+        return None
+
+    output = str(result)
+    answer = _RENDERERS[tool_name](result)
+    call_id = f"fastpath_{uuid.uuid4().hex[:12]}"
+    return FastPathTurn(
+        tool_name=tool_name,
+        tool_args=tool_args,
+        tool_output=output,
+        answer=answer,
+        trace={
+            "step": "tool_call",
+            "tool_name": tool_name,
+            "input": tool_args,
+            "output": output,
+            "timestamp": datetime.now().isoformat(),
+        },
+        # Same shape the agent would have produced, so later turns see a
+        # normal tool call in the history.
+        messages=[
+            AIMessage(content="", tool_calls=[{"name": tool_name, "args": tool_args, "id": call_id}]),
+            ToolMessage(content=output, tool_call_id=call_id, name=tool_name),
+            AIMessage(content=answer),
+        ],
+    )
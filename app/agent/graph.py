@@ -7,17 +7,29 @@ Graph topology:
 The LLM receives all tools simultaneously.  Rich tool descriptions guide it
 to select the right tool for each user request.  The ReAct loop continues
 until the model produces a response without any tool calls.
+
+If the run config carries a Speculation (``configurable.speculation``), the
+first agent call of a turn also starts a speculative knowledge-base search
+for FAQ-looking messages; see app/agent/speculative.py.
+
+A TurnBudget (``configurable.budget``, app/agent/budget.py) bounds the loop
+by model calls, wall-clock time and tokens; when one runs out the turn ends
+with a final answer instead of another tool round.
 """
 from __future__ import annotations
 
+import asyncio
+import functools
 import operator
 from datetime import datetime
 from pathlib import Path
 from typing import Annotated, Literal, Sequence, TypedDict
 from zoneinfo import ZoneInfo
 
-from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
+from langgraph.channels.delta import DeltaChannel
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 
@@ -33,8 +45,18 @@ _PROMPT_TEMPLATE = _PROMPT_PATH.read_text(encoding="utf-8")
 # State
 # ---------------------------------------------------------------------------
 
+def _add_message_batches(messages: Sequence[BaseMessage], batches: Sequence) -> list:
+    for batch in batches:
+        messages = add_messages(messages, batch)
+    return messages
+
+
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], add_messages]
+    # Checkpoints store only each step's new messages (see app/sessions.py),
+    # plus a full snapshot every 25 updates so loading a long session never
+    # replays more than that.
+    messages: Annotated[list[BaseMessage], DeltaChannel(_add_message_batches, snapshot_frequency=25)]
+    # Per turn: the router resets it with Overwrite([]) on every input
     tool_trace: Annotated[list, operator.add]
 
 
@@ -49,12 +71,36 @@ def _build_system_prompt() -> str:
     return _PROMPT_TEMPLATE.replace("{{DATE}}", date_str).replace("{{TIME}}", time_str)
 
 
+def _usage_tokens(response: AIMessage, prompt: list[BaseMessage]) -> int:
+    """Tokens used by one model call, estimated if the API reported none."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return usage["total_tokens"]
+    from app.rag.packing import count_tokens
+
+    return sum(count_tokens(str(m.content)) for m in [*prompt, response])
+
+
 # ---------------------------------------------------------------------------
 # Graph builder
 # ---------------------------------------------------------------------------
 
-def build_graph(vectorstore, model_name: str, api_key: str):
-    """Build and compile the pure ReAct LangGraph agent."""
+def build_graph(
+    knowledge_bases,
+    model_name: str,
+    api_key: str,
+    rag_fetch_k: int = 6,
+    rag_max_distance: float = 1.2,
+    rag_token_budget: int = 400,
+    checkpointer=None,
+):
+    """Build and compile the pure ReAct LangGraph agent.
+
+    ``knowledge_bases`` is the KnowledgeBaseRegistry the RAG tool searches
+    (app/rag/registry.py).  The ``rag_*`` options
+    control how retrieved chunks are packed into the prompt.  With a
+    ``checkpointer`` the graph keeps each session's history itself.
+    """
 
     from app.agent.tools.calendar_tools import (
         book_appointment,
@@ -67,9 +113,16 @@ def build_graph(vectorstore, model_name: str, api_key: str):
         get_product_details,
         search_products,
     )
-    from app.agent.tools.rag_tools import make_rag_tool
+    from app.agent.budget import FINAL_ANSWER_INSTRUCTION
+    from app.agent.tools.rag_tools import make_rag_search, make_rag_tool
 
-    search_knowledge_base = make_rag_tool(vectorstore)
+    rag_search = make_rag_search(
+        knowledge_bases,
+        fetch_k=rag_fetch_k,
+        max_distance=rag_max_distance,
+        token_budget=rag_token_budget,
+    )
+    search_knowledge_base = make_rag_tool(rag_search)
 
     all_tools = [
         check_availability,
@@ -83,27 +136,68 @@ def build_graph(vectorstore, model_name: str, api_key: str):
     ]
     tool_map: dict[str, object] = {t.name: t for t in all_tools}
 
+    from app.http_clients import get_http_clients
+
+    http_client, http_async_client = get_http_clients()
     llm = ChatOpenAI(
         model=model_name,
         temperature=0,
         openai_api_key=api_key,
         streaming=True,
+        stream_usage=True,  # token counts for the per-turn budget
+        http_client=http_client,
+        http_async_client=http_async_client,
+        # The SDK sends its own per-request timeout (None = no limit), which
+        # overrides the pool's; pass the pool's explicitly.
+        request_timeout=http_async_client.timeout,
     )
     llm_with_tools = llm.bind_tools(all_tools)
+    # Same tool schemas, but the model must answer in text
+    llm_final = llm.bind_tools(all_tools, tool_choice="none")
 
     # ------------------------------------------------------------------
     # Node: agent  (LLM decides which tools to call)
     # ------------------------------------------------------------------
-    def agent_node(state: AgentState) -> dict:
+    # Nodes are async so cancelling the graph task (client disconnect) also
+    # aborts the in-flight model request instead of leaving it in a thread.
+    async def agent_node(state: AgentState, config: RunnableConfig) -> dict:
+        last = state["messages"][-1]
+        speculation = config.get("configurable", {}).get("speculation")
+        if speculation is not None and isinstance(last, HumanMessage):
+            # First model call of the turn: retrieval overlaps with it.
+            knowledge_base = config["configurable"].get("knowledge_base")
+            speculation.start(str(last.content), functools.partial(rag_search, knowledge_base=knowledge_base))
+
         messages = [SystemMessage(content=_build_system_prompt())] + list(state["messages"])
-        response = llm_with_tools.invoke(messages)
+        budget = config.get("configurable", {}).get("budget")
+        if budget is None:
+            return {"messages": [await llm_with_tools.ainvoke(messages)]}
+
+        model = llm_with_tools
+        reason = budget.check()
+        if reason is not None:
+            fallback = budget.exhaust(reason)
+            if fallback is not None:
+                return {"messages": [AIMessage(content=fallback)]}
+            # Out of iterations: one last call without tool use.
+            model = llm_final
+            messages.append(SystemMessage(content=FINAL_ANSWER_INSTRUCTION))
+
+        budget.iterations += 1
+        try:
+            async with asyncio.timeout(budget.remaining()):
+                response = await model.ainvoke(messages)
+        except TimeoutError:
+            return {"messages": [AIMessage(content=budget.exhaust("deadline"))]}
+        budget.tokens += _usage_tokens(response, messages)
         return {"messages": [response]}
 
     # ------------------------------------------------------------------
     # Node: tools  (execute every tool_call from the last AI message)
     # ------------------------------------------------------------------
-    def tools_node(state: AgentState) -> dict:
+    async def tools_node(state: AgentState, config: RunnableConfig) -> dict:
         last_message = state["messages"][-1]
+        budget = config.get("configurable", {}).get("budget")
         results: list[ToolMessage] = []
         traces: list[dict] = []
 
@@ -113,8 +207,13 @@ def build_graph(vectorstore, model_name: str, api_key: str):
 
             if tool_name in tool_map:
                 try:
-                    result = tool_map[tool_name].invoke(tool_args)
+                    # Every tool call still gets a ToolMessage, so the
+                    # history stays valid when the deadline cuts one off.
+                    async with asyncio.timeout(budget.remaining() if budget else None):
+                        result = await tool_map[tool_name].ainvoke(tool_args, config)
                     result_str = result if isinstance(result, str) else str(result)
+                except TimeoutError:
+                    result_str = "Tool error: the time budget for this request ran out."
                 except Exception as exc:
                     result_str = f"Tool error: {exc}"
             else:
@@ -159,4 +258,4 @@ def build_graph(vectorstore, model_name: str, api_key: str):
     graph.add_conditional_edges("agent", should_continue, {"tools": "tools", END: END})
     graph.add_edge("tools", "agent")
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
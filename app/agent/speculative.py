@@ -0,0 +1,95 @@
+"""
+Speculative knowledge-base retrieval.
+
+For a policy question the first LLM call usually does nothing but decide to
+call search_knowledge_base, so retrieval normally starts one full round-trip
+late.  When a cheap keyword check says the user's message looks like an FAQ
+topic, the search is started in a worker thread at the same time as that
+first LLM call.  If the model then asks for a sufficiently similar query,
+the RAG tool returns the prefetched result instead of searching again.
+
+One Speculation object lives for one chat turn and is passed to the graph
+through ``config["configurable"]["speculation"]``.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from app import metrics
+from app.rag.hybrid import STOPWORDS, tokenize
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-prefetch")
+
+# Topics covered by the FAQ PDF (see prompt.md, "ADOOB KNOWLEDGE BASE").
+_FAQ_TOPIC_RE = re.compile(
+    r"\b(polic(y|ies)|return(s|ing)?|refund(s|ed)?|exchange|shipping|ship|deliver(y|ed)?|"
+    r"warrant(y|ies)|guarantee|payment|pay|installments?|cod|cash on delivery|"
+    r"rewards?|points?|loyalty|tiers?|b2b|corporate|business account|student|discounts?|"
+    r"sustainab\w*|recycl\w*|trade[- ]?in|privacy|security|store hours|branch(es)?)\b",
+    re.IGNORECASE,
+)
+
+_STOPWORDS = STOPWORDS | {"adoob", "please", "tell"}
+
+
+def looks_like_faq(message: str) -> bool:
+    """Cheap local classifier: does ``message`` mention a knowledge-base topic?"""
+    return bool(_FAQ_TOPIC_RE.search(message))
+
+
+def _terms(text: str) -> set[str]:
+    return {t for t in tokenize(text) if t not in _STOPWORDS}
+
+
+class Speculation:
+    """Holds at most one prefetched knowledge-base result for a chat turn."""
+
+    def __init__(self, min_overlap: float = 0.3):
+        self.min_overlap = min_overlap
+        self._lock = threading.Lock()
+        self._query: str | None = None
+        self._future: Future | None = None
+        self._used = False
+
+    def start(self, message: str, search: Callable[[str], str]) -> bool:
+        """Prefetch ``search(message)`` if it looks like an FAQ question."""
+        with self._lock:
+            if self._future is not None or not looks_like_faq(message):
+                return False
+            self._query = message
+            self._future = _executor.submit(search, message)
+        metrics.incr("speculative_prefetches")
+        return True
+
+    def take(self, query: str) -> str | None:
+        """Return the prefetched result if ``query`` matches it (once only).
+
+        Blocks until the prefetch finishes; called from the tool's thread.
+        """
+        with self._lock:
+            if self._future is None or self._used:
+                return None
+            wanted, have = _terms(query), _terms(self._query or "")
+            overlap = len(wanted & have) / len(wanted | have) if wanted | have else 0.0
+            if overlap < self.min_overlap:
+                metrics.incr("speculative_misses")
+                return None
+            self._used = True
+            future = self._future
+        try:
+            result = future.result()
+        except Exception:
+            return None
+        metrics.incr("speculative_hits")
+        return result
+
+    def discard(self) -> None:
+        """Drop an unused prefetch at the end of the turn."""
+        with self._lock:
+            if self._future is not None and not self._used:
+                self._future.cancel()
+                metrics.incr("speculative_unused")
+            self._future = None
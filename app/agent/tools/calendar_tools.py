@@ -2,8 +2,15 @@
 Calendar tools – fully mocked with an in-memory store.
 All availability and booking checks are timezone-aware (Asia/Riyadh).
 Past dates and past time slots on today's date are always rejected.
+
+Appointments are kept as slotted records rather than dicts: dates, slots,
+services and statuses are interned (a handful of distinct values shared by
+every booking) and timestamps are epoch seconds.  ``to_dict()`` renders the
+same shape the tools have always returned.
 """
+import sys
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -11,10 +18,47 @@ from langchain_core.tools import tool
 
 TIMEZONE = ZoneInfo("Asia/Riyadh")
 
+
+@dataclass(slots=True)
+class Appointment:
+    booking_id: str
+    date: str
+    time_slot: str
+    service: str
+    customer_name: str
+    customer_email: str
+    notes: str
+    status: str
+    created_at: int  # epoch seconds
+    cancelled_at: int | None = None
+    cancellation_reason: str | None = None
+
+    def to_dict(self) -> dict:
+        record = {
+            "booking_id": self.booking_id,
+            "date": self.date,
+            "time_slot": self.time_slot,
+            "service": self.service,
+            "customer_name": self.customer_name,
+            "customer_email": self.customer_email,
+            "notes": self.notes,
+            "status": self.status,
+            "created_at": _isoformat(self.created_at),
+        }
+        if self.cancelled_at is not None:
+            record["cancelled_at"] = _isoformat(self.cancelled_at)
+            record["cancellation_reason"] = self.cancellation_reason
+        return record
+
+
+def _isoformat(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, tz=TIMEZONE).isoformat()
+
+
 # ---------------------------------------------------------------------------
-# In-memory appointment store  {booking_id: appointment_dict}
+# In-memory appointment store  {booking_id: Appointment}
 # ---------------------------------------------------------------------------
-_appointments: dict[str, dict] = {}
+_appointments: dict[str, Appointment] = {}
 
 _ALL_SLOTS = ["09:00", "10:00", "11:00", "12:00", "14:00", "15:00", "16:00", "17:00"]
 
@@ -34,9 +78,9 @@ def _future_slots(date_str: str) -> list[str]:
     today_str = now.strftime("%Y-%m-%d")
 
     booked = {
-        a["time_slot"]
+        a.time_slot
         for a in _appointments.values()
-        if a["date"] == date_str and a["status"] == "confirmed"
+        if a.date == date_str and a.status == "confirmed"
     }
 
     result = []
@@ -171,17 +215,17 @@ def book_appointment(
         }
 
     booking_id = f"BK{uuid.uuid4().hex[:8].upper()}"
-    _appointments[booking_id] = {
-        "booking_id": booking_id,
-        "date": date,
-        "time_slot": time_slot,
-        "service": service,
-        "customer_name": customer_name,
-        "customer_email": customer_email,
-        "notes": notes,
-        "status": "confirmed",
-        "created_at": now.isoformat(),
-    }
+    _appointments[booking_id] = Appointment(
+        booking_id=booking_id,
+        date=sys.intern(date),
+        time_slot=sys.intern(time_slot),
+        service=sys.intern(service),
+        customer_name=customer_name,
+        customer_email=customer_email,
+        notes=notes,
+        status="confirmed",
+        created_at=int(now.timestamp()),
+    )
 
     return {
         "success": True,
@@ -215,19 +259,19 @@ def cancel_appointment(booking_id: str, reason: str = "") -> dict:
         return {"error": f"Booking ID '{booking_id}' not found. Use list_appointments to find it."}
 
     appt = _appointments[bid]
-    if appt["status"] == "cancelled":
+    if appt.status == "cancelled":
         return {"error": f"Booking '{booking_id}' is already cancelled."}
 
-    appt["status"] = "cancelled"
-    appt["cancelled_at"] = _now_riyadh().isoformat()
-    appt["cancellation_reason"] = reason
+    appt.status = "cancelled"
+    appt.cancelled_at = int(_now_riyadh().timestamp())
+    appt.cancellation_reason = reason
 
     return {
         "success": True,
         "booking_id": bid,
         "message": (
-            f"Appointment for {appt['customer_name']} on {appt['date']} "
-            f"at {appt['time_slot']} has been cancelled."
+            f"Appointment for {appt.customer_name} on {appt.date} "
+            f"at {appt.time_slot} has been cancelled."
         ),
         "refund_policy": "Cancellations made 24+ hours in advance are eligible for a full refund.",
     }
@@ -249,7 +293,7 @@ def list_appointments(customer_name: str) -> dict:
     name_lower = customer_name.lower()
     matches = [
         a for a in _appointments.values()
-        if name_lower in a["customer_name"].lower()
+        if name_lower in a.customer_name.lower()
     ]
 
     if not matches:
@@ -262,5 +306,5 @@ def list_appointments(customer_name: str) -> dict:
     return {
         "customer": customer_name,
         "total": len(matches),
-        "appointments": sorted(matches, key=lambda x: (x["date"], x["time_slot"])),
+        "appointments": [a.to_dict() for a in sorted(matches, key=lambda x: (x.date, x.time_slot))],
     }
@@ -2,15 +2,83 @@
 RAG tool factory – returns a @tool that searches the ChromaDB vectorstore.
 The description is intentionally detailed so the ReAct LLM knows to call
 this for any company/policy/FAQ question, without an external classifier.
+
+Stores come from the knowledge-base registry (app/rag/registry.py) on every
+call, so the agent can be built (and serve catalog/calendar requests) while
+a knowledge base is still loading.  The knowledge base searched is the one
+named in the run config (``config["configurable"]["knowledge_base"]``, set
+per chat request), or the default.
+
+Scored hits are packed before they reach the prompt (app/rag/packing.py):
+low-relevance chunks are dropped, adjacent chunks are stitched back into
+passages, and the result is capped at a token budget.
+
+When the chat turn carries a Speculation (app/agent/speculative.py) in its
+run config, a matching prefetched result is returned instead of searching.
 """
+from typing import TYPE_CHECKING, Callable
+
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
+from app import metrics
+from app.rag.packing import count_tokens, pack_passages
+from app.rag.registry import KnowledgeBaseUnavailable
+
+if TYPE_CHECKING:
+    from app.rag.registry import KnowledgeBaseRegistry
+
 
-def make_rag_tool(vectorstore):
-    """Return a LangChain tool that searches the knowledge-base vectorstore."""
+def make_rag_search(
+    knowledge_bases: "KnowledgeBaseRegistry",
+    fetch_k: int = 6,
+    max_distance: float = 1.2,
+    token_budget: int = 400,
+) -> Callable[..., str]:
+    """Return ``search(query, knowledge_base=None)`` giving the formatted context.
+
+    ``knowledge_bases`` yields the store for a knowledge base, or None while
+    it is still loading, and raises KnowledgeBaseUnavailable if it failed to
+    load.  ``fetch_k`` candidates are retrieved; those with a distance above
+    ``max_distance`` are dropped and the rest are packed into at most
+    ``token_budget`` tokens.
+    """
+
+    def search(query: str, knowledge_base: str | None = None) -> str:
+        try:
+            with knowledge_bases.use(knowledge_base) as vectorstore:
+                if vectorstore is None:
+                    return (
+                        "The knowledge base is still loading. Please ask the customer "
+                        "to try this question again in a moment."
+                    )
+                return _search(vectorstore, query)
+        except KnowledgeBaseUnavailable:
+            return (
+                "The knowledge base is currently unavailable. Apologise to the "
+                "customer and offer to help with products or appointments instead."
+            )
+
+    def _search(vectorstore, query: str) -> str:
+        try:
+            hits = vectorstore.similarity_search_with_score(query, k=fetch_k)
+            passages = pack_passages(hits, token_budget=token_budget, max_distance=max_distance)
+            if not passages:
+                return "No relevant information found in the knowledge base."
+            metrics.observe("rag_context_tokens", sum(count_tokens(p) for p in passages))
+            parts = [f"[Source {i + 1}]\n{text}" for i, text in enumerate(passages)]
+            return "\n\n---\n\n".join(parts)
+        except Exception as exc:
+            return f"Error searching knowledge base: {exc}"
+
+    return search
+
+
+def make_rag_tool(search: Callable[..., str]):
+    """Return a LangChain tool wrapping ``search`` (see make_rag_search)."""
 
     @tool
-    def search_knowledge_base(query: str) -> str:
+    def search_knowledge_base(query: str, config: RunnableConfig) -> str:
         """Search the company knowledge base and return relevant information.
 
         Use this tool when the user asks about ANY of the following:
@@ -36,13 +104,12 @@ def make_rag_tool(vectorstore):
             formatted as numbered sources.  Use this content verbatim
             or summarise it accurately in your response.
         """
-        try:
-            docs = vectorstore.similarity_search(query, k=4)
-            if not docs:
-                return "No relevant information found in the knowledge base."
-            parts = [f"[Source {i + 1}]\n{doc.page_content}" for i, doc in enumerate(docs)]
-            return "\n\n---\n\n".join(parts)
-        except Exception as exc:
-            return f"Error searching knowledge base: {exc}"
+        configurable = config.get("configurable", {})
+        speculation = configurable.get("speculation")
+        if speculation is not None:
+            prefetched = speculation.take(query)
+            if prefetched is not None:
+                return prefetched
+        return search(query, configurable.get("knowledge_base"))
 
     return search_knowledge_base
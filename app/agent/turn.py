@@ -0,0 +1,114 @@
+"""
+Chat turn setup shared by /api/chat, WS /api/ws and the batch runner.
+
+``answer_fast_path`` tries the deterministic fast path (app/agent/fast_path.py)
+and persists its answer.  Otherwise an ``AgentTurn`` carries what one graph
+run needs – the ReAct budget, speculative retrieval, run config and input –
+and records the turn's metrics once it completes.  Transports only differ in
+how they run the graph and report its events.
+"""
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from app import metrics, sessions
+
+if TYPE_CHECKING:
+    from app.agent.fast_path import FastPathTurn
+
+
+def _record_fast_path_hit(elapsed: float) -> None:
+    """Count a fast-path answer and estimate the time saved against the
+    average agent turn."""
+    metrics.incr("chat_turns")
+    metrics.incr("fast_path_hits")
+    metrics.observe("fast_path_seconds", elapsed)
+    typical = metrics.average("chat_agent_turn_seconds")
+    metrics.incr("fast_path_seconds_saved_estimate", max(0.0, typical - elapsed))
+
+
+async def answer_fast_path(graph, session_id: str, message: str) -> "FastPathTurn | None":
+    """Answer ``message`` without the LLM if a fast-path rule matches.
+
+    The turn is written to the session before it is returned, so the caller
+    may report it as done.  None if the fast path is disabled or no rule
+    matched; a failed write propagates.
+    """
+    from langchain_core.messages import HumanMessage
+
+    from app.agent.fast_path import try_fast_path
+    from app.config import settings
+
+    if not settings.fast_path_enabled:
+        return None
+    started = time.monotonic()
+    turn = await try_fast_path(message)
+    if turn is None:
+        metrics.incr("fast_path_misses")
+        return None
+    await graph.aupdate_state(
+        sessions.thread_config(session_id),
+        {"messages": [HumanMessage(content=message), *turn.messages]},
+        as_node="agent",
+    )
+    _record_fast_path_hit(time.monotonic() - started)
+    return turn
+
+
+class AgentTurn:
+    """Budget, speculative retrieval, run config and input for one graph run."""
+
+    def __init__(self, session_id: str, message: str, knowledge_base: str):
+        from langchain_core.messages import HumanMessage
+        from langgraph.types import Overwrite
+
+        from app.agent.budget import TurnBudget
+        from app.agent.speculative import Speculation
+        from app.config import settings
+
+        self.started = time.monotonic()
+        self.budget = TurnBudget(
+            max_iterations=settings.agent_max_iterations,
+            deadline=settings.agent_deadline_seconds,
+            max_tokens=settings.agent_max_tokens,
+        )
+        self.speculation = (
+            Speculation(settings.speculative_min_overlap) if settings.speculative_retrieval else None
+        )
+        self.config = sessions.thread_config(
+            session_id, speculation=self.speculation, budget=self.budget, knowledge_base=knowledge_base
+        )
+        # Only the new message goes in; the checkpointer supplies the history.
+        self.input = {"messages": [HumanMessage(content=message)], "tool_trace": Overwrite([])}
+
+    def discard(self) -> None:
+        """Drop an unused speculative prefetch; call once the run has ended."""
+        if self.speculation is not None:
+            self.speculation.discard()
+
+    def record(self, tool_trace: list, streamed_tokens: int | None = None) -> None:
+        """Record metrics for a completed turn.
+
+        Knowledge-base calls are counted per turn (repeats usually mean a
+        retrieval miss), along with ReAct usage and which budget, if any, cut
+        the turn short.  ``streamed_tokens`` is None for turns run without
+        streaming.
+        """
+        metrics.incr("chat_turns")
+        if streamed_tokens is not None:
+            metrics.observe("chat_streamed_tokens", streamed_tokens)
+        rag_calls = sum(1 for t in tool_trace if t.get("tool_name") == "search_knowledge_base")
+        if rag_calls:
+            metrics.incr("rag_turns")
+            metrics.incr("rag_calls", rag_calls)
+            metrics.incr("rag_repeat_calls", rag_calls - 1)
+            metrics.observe("rag_calls_per_turn", rag_calls)
+
+        budget = self.budget
+        metrics.observe("agent_iterations_per_turn", budget.iterations)
+        metrics.observe("agent_tokens_per_turn", budget.tokens)
+        if budget.exhausted is not None:
+            metrics.incr("agent_budget_exhausted")
+            metrics.incr(f"agent_budget_exhausted_{budget.exhausted}")
+        metrics.observe("chat_agent_turn_seconds", time.monotonic() - self.started)
@@ -0,0 +1,266 @@
+"""
+Batch conversation runner for offline evaluation.
+
+Input is JSONL, one conversation per line:
+
+    {"id": "refund-01", "turns": ["What is your refund policy?", "And for opened items?"]}
+
+An optional ``"knowledge_base"`` selects the FAQ corpus, as in /api/chat.
+Each conversation runs its turns in order on a throwaway session thread
+(deleted afterwards); up to ``parallelism`` conversations run at once.
+Results are yielded as JSONL-ready dicts in completion order – ``index`` is
+the input line number – followed by one ``{"summary": …}`` record:
+
+    {"index": 0, "id": "refund-01", "latency_ms": 5120.4, "tokens": 6234,
+     "turns": [{"input": …, "output": …, "tools": [...], "latency_ms": …,
+                "tokens": …, "iterations": …, "budget_exhausted": null}, …]}
+
+A conversation that cannot be started (invalid line, unknown knowledge
+base) yields just its ``index``, ``id`` if known, and ``error``, and is left
+out of the summary latencies.
+
+No token frames are produced; turns use graph.ainvoke with the same fast
+path, budgets and speculative retrieval as /api/chat.
+
+Used by POST /api/chat/batch and from the command line:
+
+    python -m app.batch conversations.jsonl [-o results.jsonl] [--parallelism 8]
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+from app import metrics, sessions
+
+
+async def _aiter(items: Iterable) -> AsyncIterator:
+    for item in items:
+        yield item
+
+
+def parse_conversation(line: str) -> dict:
+    """Validate one input line; raises ValueError with a readable message."""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"invalid JSON ({exc})") from exc
+    turns = record.get("turns") if isinstance(record, dict) else None
+    if not isinstance(turns, list) or not turns or not all(isinstance(t, str) for t in turns):
+        raise ValueError("expected an object with a non-empty 'turns' list of strings")
+    return record
+
+
+async def _run_turn(graph, thread_id: str, message: str, knowledge_base: str) -> dict:
+    from app.agent.turn import AgentTurn, answer_fast_path
+
+    started = time.monotonic()
+    fast = await answer_fast_path(graph, thread_id, message)
+    if fast is not None:
+        return {
+            "input": message,
+            "output": fast.answer,
+            "tools": [fast.tool_name],
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
+            "tokens": 0,
+            "iterations": 0,
+            "budget_exhausted": None,
+            "fast_path": True,
+        }
+
+    turn = AgentTurn(thread_id, message, knowledge_base)
+    try:
+        output = await graph.ainvoke(turn.input, turn.config, durability="exit")
+    finally:
+        turn.discard()
+    tool_trace = output.get("tool_trace", [])
+    turn.record(tool_trace)
+
+    return {
+        "input": message,
+        "output": str(output["messages"][-1].content),
+        "tools": [t["tool_name"] for t in tool_trace],
+        "latency_ms": round((time.monotonic() - started) * 1000, 1),
+        "tokens": turn.budget.tokens,
+        "iterations": turn.budget.iterations,
+        "budget_exhausted": turn.budget.exhausted,
+    }
+
+
+async def run_conversation(graph, index: int, conversation: dict) -> dict:
+    """Run every turn of ``conversation`` on a fresh thread."""
+    from app.main import knowledge_bases
+    from app.rag.registry import UnknownKnowledgeBase
+
+    thread_id = f"batch-{uuid.uuid4().hex}"
+    result: dict = {"index": index, "id": conversation.get("id", index)}
+    try:
+        knowledge_base = knowledge_bases.resolve(conversation.get("knowledge_base"))
+    except UnknownKnowledgeBase:
+        result["error"] = f"unknown knowledge base '{conversation['knowledge_base']}'"
+        return result
+
+    result["turns"] = []
+
+    started = time.monotonic()
+    try:
+        for message in conversation["turns"]:
+            result["turns"].append(await _run_turn(graph, thread_id, message, knowledge_base))
+    except Exception as exc:
+        result["error"] = f"turn {len(result['turns'])}: {exc}"
+    finally:
+        await graph.checkpointer.adelete_thread(thread_id)
+    result["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+    result["tokens"] = sum(t["tokens"] for t in result["turns"])
+    return result
+
+
+class _Totals:
+    """Running aggregates for the summary record, so results need not be kept."""
+
+    def __init__(self):
+        self.conversations = 0
+        self.errors = 0
+        self.turns = 0
+        self.tokens = 0
+        self.budget_exhausted = 0
+        self.latencies: list[float] = []
+
+    def add(self, result: dict) -> None:
+        self.conversations += 1
+        if "error" in result:
+            self.errors += 1
+        if "turns" in result:  # conversations that never started have no latency
+            self.latencies.append(result["latency_ms"])
+        for turn in result.get("turns", []):
+            self.turns += 1
+            self.tokens += turn["tokens"]
+            if turn["budget_exhausted"]:
+                self.budget_exhausted += 1
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "conversations": self.conversations,
+            "errors": self.errors,
+            "turns": self.turns,
+            "tokens": self.tokens,
+            "budget_exhausted": self.budget_exhausted,
+            "latency_ms_p50": statistics.median(latencies) if latencies else 0.0,
+            "latency_ms_p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            "wall_seconds": round(elapsed, 2),
+        }
+
+
+async def run_batch(graph, lines: AsyncIterable[str] | Iterable[str], parallelism: int) -> AsyncIterator[dict]:
+    """Run the JSONL conversations in ``lines``, yielding results as they finish.
+
+    Lines are consumed lazily: at most ``parallelism`` conversations are in
+    flight, so a large input is never held in memory as tasks.  Results are
+    not kept once yielded; the summary is built from running totals.
+    """
+    if not hasattr(lines, "__aiter__"):
+        lines = _aiter(lines)
+
+    started = time.monotonic()
+    pending: set[asyncio.Task] = set()
+    totals = _Totals()
+
+    def _done(task: asyncio.Task) -> dict:
+        result = task.result()
+        totals.add(result)
+        metrics.incr("batch_conversations")
+        if "error" in result:
+            metrics.incr("batch_errors")
+        return result
+
+    try:
+        index = -1
+        async for line in lines:
+            if not line.strip():
+                continue
+            index += 1
+            try:
+                conversation = parse_conversation(line)
+            except ValueError as exc:
+                result = {"index": index, "error": str(exc)}
+                totals.add(result)
+                yield result
+                continue
+
+            pending.add(asyncio.create_task(run_conversation(graph, index, conversation)))
+            if len(pending) >= parallelism:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    yield _done(task)
+
+        while pending:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                yield _done(task)
+    finally:
+        # Consumer went away (client disconnect): stop the remaining work.
+        for task in pending:
+            task.cancel()
+
+    yield {"summary": totals.summary(time.monotonic() - started)}
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+async def _main_async(args, source, out) -> None:
+    import app.main as main
+    from app.config import settings
+    from app.http_clients import close_http_clients
+
+    def _write(line: str) -> None:
+        out.write(line)
+        out.flush()
+
+    # Batch threads are deleted afterwards; keep them out of the real store.
+    settings.session_db_path = args.session_db
+    try:
+        await main._warm_up()
+        if main.graph is None:
+            raise SystemExit(f"Agent failed to start: {main.warmup_error or 'unknown error'}")
+
+        async for result in run_batch(main.graph, source, args.parallelism):
+            await asyncio.to_thread(_write, json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        # The SQLite connection's worker thread would otherwise keep the
+        # process alive after a failed start.
+        await sessions.close_checkpointer()
+        await close_http_clients()
+
+
+def main() -> None:
+    import argparse
+
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description="Run JSONL conversations through the agent.")
+    parser.add_argument("input", help="JSONL file, one {'id', 'turns': [...]} object per line")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    parser.add_argument("--parallelism", type=int, default=settings.batch_max_parallelism)
+    parser.add_argument("--session-db", default=":memory:", help="SQLite path for the batch threads")
+    args = parser.parse_args()
+
+    # Files are opened here, before the event loop starts.
+    with open(args.input, encoding="utf-8") as source:
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            asyncio.run(_main_async(args, source, out))
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Product catalog store – loaded from a JSONL or Parquet file and replaced
+atomically on reload.
+
+Each product is kept as a slotted, immutable ``Product`` record (interned
+category/brand/spec-key strings, tuples instead of lists and dicts) rather
+than a plain dict.  A load builds a complete ``CatalogSnapshot`` – products,
+the id index, facets and trigram index – off the request path, then swaps
+the module-level reference in one assignment.  Tool calls take the current
+snapshot once and keep using it, so a reload never changes data under a
+request that is already running.
+
+Each snapshot also carries a FacetIndex – category/brand counts, price and
+rating buckets, and the spec keys used in each category – for the products
+page and the catalog tools.  On reload it is updated from the previous
+snapshot by applying only the products that were added, removed or changed.
+A trigram index over the words in product names, brands and tags
+(app/trigram.py) is built with the snapshot for typo-tolerant search.
+
+File formats (one product per line / row, same fields as the API returns):
+  - ``.jsonl`` – streamed line by line
+  - ``.parquet`` – streamed in record batches; needs the optional ``pyarrow``
+    package.  ``specs`` may be a map/struct column or a JSON string.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from app.trigram import TrigramIndex
+
+_snapshot: CatalogSnapshot | None = None
+_reload_lock = threading.Lock()
+
+_REQUIRED_FIELDS = ("id", "name", "price")
+
+# Lower bounds of the facet buckets; each bucket runs up to the next bound.
+PRICE_BUCKETS = (0, 50, 100, 250, 500, 1000, 2000)
+RATING_BUCKETS = (0.0, 3.0, 4.0, 4.5)
+
+_TERM_RE = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True, slots=True)
+class Product:
+    id: str
+    name: str
+    category: str
+    brand: str
+    price: float
+    description: str
+    specs: tuple[tuple[str, object], ...]
+    rating: float
+    stock: int
+    tags: tuple[str, ...]
+
+    @classmethod
+    def from_record(cls, record: dict) -> Product:
+        missing = [f for f in _REQUIRED_FIELDS if record.get(f) in (None, "")]
+        if missing:
+            raise ValueError(f"product record is missing {', '.join(missing)}: {record!r:.120}")
+
+        specs = record.get("specs") or {}
+        if isinstance(specs, str):
+            specs = json.loads(specs)
+        if isinstance(specs, dict):
+            specs = specs.items()
+
+        name = str(record["name"])
+        category = sys.intern(str(record.get("category") or ""))
+        brand = sys.intern(str(record.get("brand") or ""))
+        description = str(record.get("description") or "")
+        tags = tuple(sys.intern(str(t)) for t in record.get("tags") or ())
+        return cls(
+            id=str(record["id"]).upper(),
+            name=name,
+            category=category,
+            brand=brand,
+            price=float(record["price"]),
+            description=description,
+            specs=tuple((sys.intern(str(k)), v) for k, v in specs if v is not None),
+            rating=float(record.get("rating") or 0.0),
+            stock=int(record.get("stock") or 0),
+            tags=tags,
+        )
+
+    def to_dict(self) -> dict:
+        """The product as a plain dict, in the shape the tools and API return."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category": self.category,
+            "brand": self.brand,
+            "price": self.price,
+            "description": self.description,
+            "specs": dict(self.specs),
+            "rating": self.rating,
+            "stock": self.stock,
+            "tags": list(self.tags),
+        }
+
+    @property
+    def search_text(self) -> str:
+        """Lower-cased name, description, category, brand and tags for search_products.
+
+        Built per call rather than stored, so each product holds its text once.
+        """
+        return " ".join([self.name, self.description, self.category, self.brand, *self.tags]).lower()
+
+    def terms(self) -> list[str]:
+        """Words from the name, brand and tags, as indexed for fuzzy search."""
+        text = " ".join([self.name, self.brand, *self.tags]).lower()
+        return _TERM_RE.findall(text)
+
+
+def _bucket_label(value: float, bounds: tuple, fmt: str) -> str:
+    for i in range(len(bounds) - 1, -1, -1):
+        if value >= bounds[i]:
+            break
+    low = fmt.format(bounds[i])
+    return f"{low}+" if i == len(bounds) - 1 else f"{low}-{fmt.format(bounds[i + 1])}"
+
+
+def price_bucket(price: float) -> str:
+    return _bucket_label(price, PRICE_BUCKETS, "{:g}")
+
+
+def rating_bucket(rating: float) -> str:
+    return _bucket_label(rating, RATING_BUCKETS, "{:.1f}")
+
+
+_PRICE_LABELS = tuple(price_bucket(b) for b in PRICE_BUCKETS)
+_RATING_LABELS = tuple(rating_bucket(b) for b in RATING_BUCKETS)
+
+
+class FacetIndex:
+    """Facet counts and per-category spec-key schema for a set of products."""
+
+    __slots__ = ("total", "categories", "brands", "prices", "ratings", "spec_keys", "schemas")
+
+    def __init__(self):
+        self.total = 0
+        self.categories: Counter = Counter()
+        self.brands: Counter = Counter()
+        self.prices: Counter = Counter()
+        self.ratings: Counter = Counter()
+        # category → Counter of spec keys, so a key disappears from the
+        # schema once the last product using it is removed
+        self.spec_keys: dict[str, Counter] = {}
+        # category → sorted spec keys in use, fixed once the index is built
+        self.schemas: dict[str, list[str]] = {}
+
+    @classmethod
+    def build(cls, products: Iterable[Product]) -> FacetIndex:
+        index = cls()
+        for product in products:
+            index._apply(product, 1)
+        index._freeze_schemas()
+        return index
+
+    def updated(self, old: dict[str, Product], new: dict[str, Product]) -> FacetIndex:
+        """Return a copy adjusted for the products that differ between ``old`` and ``new``."""
+        index = FacetIndex()
+        index.total = self.total
+        index.categories = self.categories.copy()
+        index.brands = self.brands.copy()
+        index.prices = self.prices.copy()
+        index.ratings = self.ratings.copy()
+        index.spec_keys = {cat: keys.copy() for cat, keys in self.spec_keys.items()}
+
+        for pid, product in old.items():
+            if new.get(pid) != product:
+                index._apply(product, -1)
+        for pid, product in new.items():
+            if old.get(pid) != product:
+                index._apply(product, 1)
+        index._freeze_schemas()
+        return index
+
+    def _apply(self, product: Product, sign: int) -> None:
+        self.total += sign
+        self.categories[product.category] += sign
+        self.brands[product.brand] += sign
+        self.prices[price_bucket(product.price)] += sign
+        self.ratings[rating_bucket(product.rating)] += sign
+        keys = self.spec_keys.setdefault(product.category, Counter())
+        for key, _ in product.specs:
+            keys[key] += sign
+
+    def _freeze_schemas(self) -> None:
+        self.schemas = {
+            cat: sorted(k for k, n in keys.items() if n > 0) for cat, keys in self.spec_keys.items()
+        }
+
+    def schema(self, category: str) -> list[str]:
+        """Sorted spec keys used by at least one product in ``category``."""
+        return self.schemas.get(category, [])
+
+    def as_dict(self, include_schema: bool = False) -> dict:
+        body = {
+            "total": self.total,
+            "categories": {k: n for k, n in sorted(self.categories.items()) if n > 0},
+            "brands": {k: n for k, n in sorted(self.brands.items()) if n > 0},
+            "price": {label: self.prices[label] for label in _PRICE_LABELS if self.prices[label] > 0},
+            "rating": {label: self.ratings[label] for label in _RATING_LABELS if self.ratings[label] > 0},
+        }
+        if include_schema:
+            body["spec_schema"] = {cat: self.schema(cat) for cat in body["categories"]}
+        return body
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    products: tuple[Product, ...]
+    by_id: dict[str, Product]
+    facets: FacetIndex
+    terms: TrigramIndex
+    source: str
+    version: int
+    loaded_at: str
+
+    def get(self, product_id: str) -> Product | None:
+        return self.by_id.get(product_id.upper())
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _iter_jsonl(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({exc})") from exc
+
+
+def _iter_parquet(path: str, batch_size: int = 1024) -> Iterator[dict]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet catalogs need the 'pyarrow' package") from exc
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    """Stream raw product records from a ``.jsonl`` or ``.parquet`` file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return _iter_jsonl(path)
+    if ext == ".parquet":
+        return _iter_parquet(path)
+    raise ValueError(f"Unsupported catalog format '{ext}' (expected .jsonl or .parquet)")
+
+
+def build_snapshot(
+    records: Iterable[dict],
+    source: str,
+    version: int,
+    previous: CatalogSnapshot | None = None,
+) -> CatalogSnapshot:
+    """Build a complete snapshot; a later record with the same id replaces an earlier one.
+
+    With ``previous``, its facet index is updated rather than rebuilt.
+    """
+    by_id: dict[str, Product] = {}
+    for record in records:
+        product = Product.from_record(record)
+        by_id[product.id] = product
+    if not by_id:
+        raise ValueError(f"Catalog '{source}' contains no products")
+    if previous is not None:
+        facets = previous.facets.updated(previous.by_id, by_id)
+    else:
+        facets = FacetIndex.build(by_id.values())
+    return CatalogSnapshot(
+        products=tuple(by_id.values()),
+        by_id=by_id,
+        facets=facets,
+        terms=TrigramIndex(term for product in by_id.values() for term in product.terms()),
+        source=source,
+        version=version,
+        loaded_at=datetime.now().isoformat(),
+    )
+
+
+def reload_catalog(path: str | None = None) -> CatalogSnapshot:
+    """Load the catalog from ``path`` (default: settings) and swap it in.
+
+    On any error the exception propagates and the current snapshot stays in
+    place.  Blocking – call through ``asyncio.to_thread`` from async code.
+    """
+    global _snapshot
+
+    if path is None:
+        from app.config import settings
+
+        path = settings.catalog_path
+
+    with _reload_lock:
+        previous = _snapshot
+        version = previous.version + 1 if previous is not None else 1
+        snapshot = build_snapshot(iter_records(path), source=path, version=version, previous=previous)
+        _snapshot = snapshot
+    print(f"[Catalog] Loaded {len(snapshot.products)} products from {path} (v{version})")
+    return snapshot
+
+
+def get_catalog() -> CatalogSnapshot:
+    """Return the current catalog snapshot, loading it on first use."""
+    snapshot = _snapshot
+    if snapshot is None:
+        snapshot = reload_catalog()
+    return snapshot
+
+
+async def aget_catalog() -> CatalogSnapshot:
+    """``get_catalog`` for async code: a first load runs in a worker thread."""
+    snapshot = _snapshot
+    if snapshot is None:
+        snapshot = await asyncio.to_thread(get_catalog)
+    return snapshot
+
+
+async def watch_catalog(path: str, interval: float = 2.0) -> None:
+    """Reload the catalog whenever ``path``'s modification time changes.
+
+    Polls rather than using OS file notifications, so it also works for
+    files replaced by a rename or on network mounts.  A file that fails to
+    load is reported and the previous catalog is kept.
+    """
+
+    def _mtime() -> float | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    last = _mtime()
+    while True:
+        await asyncio.sleep(interval)
+        current = _mtime()
+        if current is None or current == last:
+            continue
+        last = current
+        try:
+            await asyncio.to_thread(reload_catalog, path)
+        except Exception as exc:
+            print(f"[Catalog] Reload of {path} failed, keeping current catalog: {exc}")
@@ -0,0 +1,151 @@
+"""
+Admission control and per-session serialisation for chat turns.
+
+  AdmissionController – caps concurrent turns globally and per client.  Excess
+                        requests wait in a bounded queue; when the queue is full
+                        (or the wait times out) they are rejected so the router
+                        can answer 429 with Retry-After.
+  SessionLocks        – one FIFO lock per session_id, so overlapping turns on
+                        the same session run in order instead of racing on the
+                        session history.
+
+Queue depth, active turns and wait times are reported through app.metrics.
+"""
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from app import metrics
+
+
+class AdmissionRejected(Exception):
+    """Raised when a turn cannot be admitted; carries a Retry-After hint."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A granted slot.  ``release`` is idempotent so it can be called from
+    both the stream's cleanup and a response background task."""
+
+    def __init__(self, controller: "AdmissionController", client: str):
+        self._controller = controller
+        self._client = client
+        self._released = False
+
+    async def release(self) -> None:
+        if not self._released:
+            self._released = True
+            await self._controller._release(self._client)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_active: int,
+        max_per_client: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: int = 5,
+    ):
+        self.max_active = max_active
+        self.max_per_client = max_per_client
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._cond = asyncio.Condition()
+        self._active = 0
+        self._per_client: Counter[str] = Counter()
+        self._waiting = 0
+
+    def _can_run(self, client: str) -> bool:
+        return self._active < self.max_active and self._per_client[client] < self.max_per_client
+
+    def _publish(self) -> None:
+        metrics.set_gauge("chat_active_turns", self._active)
+        metrics.set_gauge("chat_queue_depth", self._waiting)
+
+    async def acquire(self, client: str) -> AdmissionTicket:
+        """Wait for a slot for ``client`` or raise AdmissionRejected."""
+        start = time.monotonic()
+        async with self._cond:
+            if not self._can_run(client):
+                if self._waiting >= self.max_queue:
+                    metrics.incr("chat_rejected_queue_full")
+                    raise AdmissionRejected("Too many requests queued.", self.retry_after)
+
+                self._waiting += 1
+                self._publish()
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(lambda: self._can_run(client)),
+                        timeout=self.queue_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    metrics.incr("chat_rejected_timeout")
+                    raise AdmissionRejected("Timed out waiting for a free slot.", self.retry_after)
+                finally:
+                    self._waiting -= 1
+                    self._publish()
+
+            self._active += 1
+            self._per_client[client] += 1
+            self._publish()
+
+        metrics.observe("chat_queue_wait_seconds", time.monotonic() - start)
+        return AdmissionTicket(self, client)
+
+    async def _release(self, client: str) -> None:
+        async with self._cond:
+            self._active -= 1
+            self._per_client[client] -= 1
+            if self._per_client[client] <= 0:
+                del self._per_client[client]
+            self._publish()
+            self._cond.notify_all()
+
+
+class SessionLocks:
+    """Lazily created per-session locks, dropped once nobody holds or awaits them."""
+
+    def __init__(self):
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._users: Counter[str] = Counter()
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._users[session_id] += 1
+        start = time.monotonic()
+        try:
+            async with lock:
+                metrics.observe("chat_session_wait_seconds", time.monotonic() - start)
+                yield
+        finally:
+            self._users[session_id] -= 1
+            if self._users[session_id] <= 0:
+                del self._users[session_id]
+                self._locks.pop(session_id, None)
+
+
+_admission: AdmissionController | None = None
+session_locks = SessionLocks()
+
+
+def get_admission() -> AdmissionController:
+    """Return the process-wide controller, configured from settings on first use."""
+    global _admission
+    if _admission is None:
+        from app.config import settings
+
+        _admission = AdmissionController(
+            max_active=settings.chat_max_concurrency,
+            max_per_client=settings.chat_max_per_client,
+            max_queue=settings.chat_max_queue,
+            queue_timeout=settings.chat_queue_timeout,
+        )
+    return _admission
@@ -1,3 +1,6 @@
+from typing import Literal
+
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -5,8 +8,78 @@ class Settings(BaseSettings):
     openai_api_key: str
     model_name: str = "gpt-5.1"
     embedding_model: str = "text-embedding-3-large"
+    # Shortened text-embedding-3 output size (e.g. 256, 1024); None = native
+    embedding_dimensions: int | None = None
     chroma_persist_dir: str = "./chroma_db_v2"
     pdf_path: str = "./Data/Adoob_FAQ.pdf"
+    # SQLite file holding chat sessions (LangGraph checkpoints, one thread per session)
+    session_db_path: str = "./sessions.sqlite"
+    session_compression: Literal["zlib", "zstd", "none"] = "zlib"  # zstd needs zstandard
+    # Product catalog (.jsonl or .parquet), reloaded when the file changes;
+    # poll interval in seconds, 0 disables the watcher
+    catalog_path: str = "./Data/products.jsonl"
+    catalog_watch_interval: float = 2.0
+    # Token for /api/admin/* (X-Admin-Token header); unset disables them
+    admin_token: str | None = None
+    # "chroma" (default) or "flat" – exact search over a memory-mapped matrix
+    vectorstore_backend: str = "chroma"
+    flat_index_dir: str = "./flat_index"
+    flat_index_dtype: str = "float16"  # "float16" or "int8"
+    # Fuse BM25 and vector rankings (reciprocal-rank fusion) for the RAG tool
+    rag_hybrid: bool = True
+    # Context packing: candidates fetched, distance cutoff (squared L2 on unit
+    # vectors, 0 = identical) and token budget for the passages returned
+    rag_fetch_k: int = 6
+    rag_max_distance: float = 1.2
+    rag_token_budget: int = 400
+    # Extra knowledge bases (brands, locales) as a JSON object of name → PDF
+    # path, indexed under KB_STORE_DIR/<name>/; the default one uses the
+    # settings above.  Each opens on first use; at most KB_MAX_RESIDENT stay
+    # open within KB_MEMORY_CAP_MB (estimated), least recently used evicted.
+    default_knowledge_base: str = "default"
+    knowledge_bases: dict[str, str] = {}
+    kb_store_dir: str = "./kb_stores"
+    kb_max_resident: int = 4
+    kb_memory_cap_mb: int = 1024
+    kb_load_wait: float = 10.0  # seconds a search waits for a lazy load
+    kb_retry_after: float = 60.0  # seconds before a failed load is retried
+    # /api/chat admission control: concurrent turns (total and per client IP),
+    # waiting requests beyond which 429 is returned, and max wait in seconds
+    chat_max_concurrency: int = 32
+    chat_max_per_client: int = 4
+    chat_max_queue: int = 64
+    chat_queue_timeout: float = 30.0
+    # Answer "show PROD003" / "compare A and B" / "cancel BK…" without the LLM
+    fast_path_enabled: bool = True
+    # Start KB retrieval for FAQ-looking messages alongside the first LLM call
+    speculative_retrieval: bool = True
+    speculative_min_overlap: float = 0.3  # query term Jaccard needed to reuse it
+    # Per-turn ReAct budgets: model calls, wall-clock seconds, total tokens (0 = off)
+    agent_max_iterations: int = 8
+    agent_deadline_seconds: float = 90.0
+    agent_max_tokens: int = 60000
+    # POST /api/chat/batch and `python -m app.batch`: conversations run at once
+    batch_max_parallelism: int = 8
+    # Shared HTTP pool for OpenAI chat + embedding traffic (app/http_clients.py)
+    http_max_connections: int = 100
+    http_max_keepalive: int = 40
+    http_keepalive_expiry: float = 120.0
+    http_timeout: float = 60.0
+    http_connect_timeout: float = 5.0
+    http_retries: int = 2
+    http_http2: bool = False  # requires the optional 'h2' package
+
+    @field_validator("session_compression")
+    @classmethod
+    def _zstd_installed(cls, value: str) -> str:
+        # Checked here so a missing package stops startup instead of the
+        # background warm-up.
+        if value == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                raise ValueError("SESSION_COMPRESSION=zstd requires the 'zstandard' package") from None
+        return value
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,85 @@
+"""
+Shared, pooled HTTP clients for all OpenAI traffic (chat model and embeddings).
+
+One sync and one async httpx client are created per process from settings.
+Pool size, keep-alive expiry, timeouts and transport-level connect retries are
+all configurable.  HTTP/2 is used when enabled and the optional ``h2`` package
+is installed.
+
+The OpenAI SDK's defaults drop idle connections after 5 s, so bursty chat
+traffic keeps paying for new TCP/TLS handshakes.  A longer keep-alive expiry
+keeps warm connections around between turns.
+"""
+import httpx
+
+_sync_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_http_clients(
+    max_connections: int,
+    max_keepalive: int,
+    keepalive_expiry: float,
+    timeout: float,
+    connect_timeout: float,
+    retries: int,
+    http2: bool = False,
+) -> tuple[httpx.Client, httpx.AsyncClient]:
+    """Create a ``(sync, async)`` client pair with identical pool settings."""
+    if http2 and not _http2_available():
+        print("[HTTP] HTTP/2 requested but 'h2' is not installed – using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry,
+    )
+    client_timeout = httpx.Timeout(timeout, connect=connect_timeout)
+    # ``retries`` re-attempts failed connection setup only; request-level
+    # retries stay with the OpenAI SDK (max_retries).
+    sync_client = httpx.Client(
+        transport=httpx.HTTPTransport(limits=limits, http2=http2, retries=retries),
+        timeout=client_timeout,
+    )
+    async_client = httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(limits=limits, http2=http2, retries=retries),
+        timeout=client_timeout,
+    )
+    return sync_client, async_client
+
+
+def get_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """Return the process-wide ``(sync, async)`` clients, creating them on first use."""
+    global _sync_client, _async_client
+    if _sync_client is None or _async_client is None:
+        from app.config import settings
+
+        _sync_client, _async_client = build_http_clients(
+            max_connections=settings.http_max_connections,
+            max_keepalive=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+            timeout=settings.http_timeout,
+            connect_timeout=settings.http_connect_timeout,
+            retries=settings.http_retries,
+            http2=settings.http_http2,
+        )
+    return _sync_client, _async_client
+
+
+async def close_http_clients() -> None:
+    """Close both clients; called on application shutdown."""
+    global _sync_client, _async_client
+    if _sync_client is not None:
+        _sync_client.close()
+    if _async_client is not None:
+        await _async_client.aclose()
+    _sync_client = _async_client = None
@@ -1,45 +1,157 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Global singletons initialised during startup
+# Global singletons initialised in the background after startup.
+# Heavy dependencies (langchain, chromadb, pdfplumber) are only imported by
+# the warm-up task, so the server starts accepting traffic immediately.
 graph = None
-vectorstore = None
+# KnowledgeBaseRegistry (app/rag/registry.py); the default knowledge base is
+# loaded at warm-up, the others on first use.
+knowledge_bases = None
+knowledge_base_ready = False
+vectorstore_error: str | None = None
+# Set when the agent itself could not be built; /api/ready and /api/chat report it
+warmup_error: str | None = None
+
+_warmup_task: asyncio.Task | None = None
+_catalog_watch_task: asyncio.Task | None = None
+
+
+async def _warm_up() -> None:
+    """Build the agent first, then load (or ingest) the default knowledge base.
+
+    Both steps run in worker threads so imports, PDF extraction and embedding
+    never block the event loop.  Catalog and calendar chat work as soon as the
+    graph is built; the knowledge-base tool reports that it is still loading
+    until the vectorstore is available.  Other knowledge bases are left for
+    their first request.
+    """
+    global graph, knowledge_bases, knowledge_base_ready, vectorstore_error, warmup_error
+
+    from app.config import settings
+
+    def _build(checkpointer):
+        from app.agent.graph import build_graph
+
+        return build_graph(
+            knowledge_bases=knowledge_bases,
+            model_name=settings.model_name,
+            api_key=settings.openai_api_key,
+            rag_fetch_k=settings.rag_fetch_k,
+            rag_max_distance=settings.rag_max_distance,
+            rag_token_budget=settings.rag_token_budget,
+            checkpointer=checkpointer,
+        )
+
+    def _load(kb):
+        from app.rag.hybrid import HybridSearcher
+
+        print(f"[RAG] Opening knowledge base '{kb.name}'")
+        store = _load_store(kb)
+        if settings.rag_hybrid:
+            print("[RAG] Building BM25 index for hybrid retrieval")
+            # Each ranker fetches more than the tool keeps, so fusion can
+            # promote chunks that only one of them ranks highly.
+            return HybridSearcher.from_vectorstore(store, fetch_k=2 * settings.rag_fetch_k)
+        return store
+
+    def _load_store(kb):
+        from app.rag.ingestion import load_or_create_flat_index, load_or_create_vectorstore
+
+        if settings.vectorstore_backend == "flat":
+            return load_or_create_flat_index(
+                pdf_path=kb.pdf_path,
+                index_dir=kb.flat_index_dir,
+                embedding_model=settings.embedding_model,
+                api_key=settings.openai_api_key,
+                dtype=settings.flat_index_dtype,
+                embedding_dimensions=settings.embedding_dimensions,
+            )
+        return load_or_create_vectorstore(
+            pdf_path=kb.pdf_path,
+            persist_dir=kb.chroma_persist_dir,
+            embedding_model=settings.embedding_model,
+            api_key=settings.openai_api_key,
+            embedding_dimensions=settings.embedding_dimensions,
+        )
+
+    from app.catalog import get_catalog
+
+    try:
+        await asyncio.to_thread(get_catalog)
+    except Exception as exc:
+        print(f"[Catalog] Failed to load {settings.catalog_path}: {exc}")
+
+    from app.rag.registry import KnowledgeBaseRegistry, estimate_bytes, knowledge_bases_from_settings
+    from app.sessions import open_checkpointer
+
+    try:
+        # Opened on the event loop: the async SQLite connection is bound to it.
+        checkpointer = await open_checkpointer(settings.session_db_path, settings.session_compression)
+
+        knowledge_bases = KnowledgeBaseRegistry(
+            knowledge_bases_from_settings(settings),
+            loader=_load,
+            default=settings.default_knowledge_base,
+            max_resident=settings.kb_max_resident,
+            memory_cap=settings.kb_memory_cap_mb * 2**20,
+            load_wait=settings.kb_load_wait,
+            retry_after=settings.kb_retry_after,
+            size_of=lambda store: estimate_bytes(store, settings.embedding_model, settings.embedding_dimensions),
+        )
+
+        print("Building LangGraph agent…")
+        graph = await asyncio.to_thread(_build, checkpointer)
+    except Exception as exc:
+        warmup_error = f"{type(exc).__name__}: {exc}"
+        print(f"[Startup] Agent failed to start: {warmup_error}")
+        return
+    print("Agent ready ✓ (knowledge base warming up)")
+
+    print("Initialising RAG vectorstore…")
+    try:
+        await asyncio.to_thread(knowledge_bases.load)
+        knowledge_base_ready = True
+    except Exception as exc:
+        vectorstore_error = str(exc)
+        print(f"[RAG] Vectorstore failed to load: {exc}")
+        return
+    print("Knowledge base ready ✓")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global graph, vectorstore
+    global _warmup_task, _catalog_watch_task
 
+    from app.catalog import watch_catalog
     from app.config import settings
-    from app.rag.ingestion import load_or_create_vectorstore
-    from app.agent.graph import build_graph
 
-    print("Initialising RAG vectorstore…")
-    vectorstore = load_or_create_vectorstore(
-        pdf_path=settings.pdf_path,
-        persist_dir=settings.chroma_persist_dir,
-        embedding_model=settings.embedding_model,
-        api_key=settings.openai_api_key,
-    )
-
-    print("Building LangGraph agent…")
-    graph = build_graph(
-        vectorstore=vectorstore,
-        model_name=settings.model_name,
-        api_key=settings.openai_api_key,
-    )
-
-    print("Agent ready ✓")
+    _warmup_task = asyncio.create_task(_warm_up())
+    if settings.catalog_watch_interval > 0:
+        _catalog_watch_task = asyncio.create_task(
+            watch_catalog(settings.catalog_path, settings.catalog_watch_interval)
+        )
     yield
 
     print("Shutting down…")
+    if not _warmup_task.done():
+        _warmup_task.cancel()
+    if _catalog_watch_task is not None:
+        _catalog_watch_task.cancel()
+
+    from app.http_clients import close_http_clients
+    from app.sessions import close_checkpointer
+
+    await close_http_clients()
+    await close_checkpointer()
+    if knowledge_bases is not None:
+        knowledge_bases.close()
 
 
 app = FastAPI(title="AI Chat Agent – FeelixAI", lifespan=lifespan)
@@ -51,18 +163,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from app.routers import chat  # noqa: E402
+from app.routers import admin, chat, ws  # noqa: E402
 
 app.include_router(chat.router, prefix="/api")
+app.include_router(ws.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 static_dir = os.path.join(os.path.dirname(__file__), "..", "static")
 
+# Frontend pages, precompressed in memory at startup (see app/static_assets.py)
+if os.path.isdir(static_dir):
+    from app.static_assets import AssetStore
 
-@app.get("/products", include_in_schema=False)
-async def products_page():
-    return FileResponse(os.path.join(static_dir, "products.html"))
-
+    static_assets = AssetStore(static_dir)
 
-# Serve the single-page frontend from /static  (must be last — catches everything)
-if os.path.isdir(static_dir):
-    app.mount("/", StaticFiles(directory=static_dir, html=True), name="static")
+    # Must be registered last — catches everything, including /products
+    @app.api_route("/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def static_file(path: str, request: Request):
+        found = static_assets.lookup(path)
+        if found is None:
+            raise HTTPException(status_code=404)
+        return static_assets.response(request, *found)
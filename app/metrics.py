@@ -0,0 +1,54 @@
+"""
+In-process metrics – counters, gauges and simple distributions, served as
+JSON by GET /api/metrics.
+
+Values are per process; with several uvicorn workers each reports its own.
+"""
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters: dict[str, float] = defaultdict(float)
+_gauges: dict[str, float] = {}
+_observations: dict[str, dict[str, float]] = {}
+
+
+def incr(name: str, value: float = 1) -> None:
+    """Add ``value`` to counter ``name``."""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float) -> None:
+    """Set gauge ``name`` to its current ``value``."""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, value: float) -> None:
+    """Record one observation (count / sum / max) for distribution ``name``."""
+    with _lock:
+        obs = _observations.setdefault(name, {"count": 0, "sum": 0.0, "max": 0.0})
+        obs["count"] += 1
+        obs["sum"] += value
+        obs["max"] = max(obs["max"], value)
+
+
+def average(name: str) -> float:
+    """Mean of distribution ``name`` so far, or 0.0 if nothing was observed."""
+    with _lock:
+        obs = _observations.get(name)
+        return obs["sum"] / obs["count"] if obs and obs["count"] else 0.0
+
+
+def snapshot() -> dict:
+    """Return a JSON-serialisable copy of every metric."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "observations": {
+                name: {**obs, "avg": obs["sum"] / obs["count"] if obs["count"] else 0.0}
+                for name, obs in _observations.items()
+            },
+        }
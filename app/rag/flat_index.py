@@ -0,0 +1,233 @@
+"""
+Exact in-process vector index over a memory-mapped, quantized embedding matrix.
+
+The FAQ corpus is small (a few hundred chunks at most), so a brute-force scan
+is both exact and faster than going through Chroma's SQLite + HNSW stack.
+
+Index directory layout:
+    embeddings.npy   (n, dim) float16 rows, or int8 rows when quantized
+    scales.npy       (n,) float32 per-row scales – int8 only
+    chunks.jsonl     one {"text": ..., "metadata": {...}} object per row
+    meta.json        {"model", "dimensions", "dtype", "count", "dim"}
+
+Rows are L2-normalised before they are stored, so one matrix–vector product
+gives cosine similarity for every chunk.  The matrix is opened with
+``np.load(mmap_mode="r")`` – every worker process maps the same file and the
+OS page cache keeps a single copy.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+SUPPORTED_DTYPES = ("float16", "int8")
+
+_EMBEDDINGS_FILE = "embeddings.npy"
+_SCALES_FILE = "scales.npy"
+_CHUNKS_FILE = "chunks.jsonl"
+_META_FILE = "meta.json"
+
+
+def index_exists(index_dir: str) -> bool:
+    """Return True if ``index_dir`` holds a complete flat index."""
+    return os.path.isfile(os.path.join(index_dir, _META_FILE))
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _atomic_save(path: str, array: np.ndarray) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, array)
+    os.replace(tmp, path)
+
+
+def _atomic_write_text(path: str, text: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp, path)
+
+
+class FlatVectorStore(VectorStore):
+    """Read-only exact vectorstore backed by a memory-mapped embedding matrix.
+
+    Scores follow Chroma's default (squared L2 distance, lower is better) so
+    the two backends are interchangeable behind ``make_rag_tool``.
+    """
+
+    def __init__(self, index_dir: str, embedding_function: Embeddings):
+        self.index_dir = index_dir
+        self._embedding_function = embedding_function
+
+        with open(os.path.join(index_dir, _META_FILE), encoding="utf-8") as fh:
+            self.meta: dict = json.load(fh)
+
+        self._matrix = np.load(os.path.join(index_dir, _EMBEDDINGS_FILE), mmap_mode="r")
+        self._scales = (
+            np.load(os.path.join(index_dir, _SCALES_FILE), mmap_mode="r")
+            if self.meta["dtype"] == "int8"
+            else None
+        )
+
+        self._docs: list[Document] = []
+        with open(os.path.join(index_dir, _CHUNKS_FILE), encoding="utf-8") as fh:
+            for line in fh:
+                row = json.loads(line)
+                self._docs.append(Document(page_content=row["text"], metadata=row["metadata"]))
+
+        if len(self._docs) != self._matrix.shape[0]:
+            raise ValueError(
+                f"Flat index at '{index_dir}' is inconsistent: "
+                f"{self._matrix.shape[0]} vectors but {len(self._docs)} chunks."
+            )
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def write_index(
+        cls,
+        index_dir: str,
+        texts: Sequence[str],
+        metadatas: Sequence[dict],
+        vectors: np.ndarray,
+        model: str,
+        dtype: str = "float16",
+        dimensions: int | None = None,
+    ) -> None:
+        """Quantize ``vectors`` and persist them with their chunks to ``index_dir``.
+
+        ``model`` and ``dimensions`` (None = the model's native size) are
+        stamped into meta.json so a configuration change triggers a re-index.
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported flat index dtype '{dtype}'. Use one of {SUPPORTED_DTYPES}.")
+
+        os.makedirs(index_dir, exist_ok=True)
+        unit = _normalise(np.asarray(vectors, dtype=np.float32))
+
+        if dtype == "int8":
+            scales = np.abs(unit).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            matrix = np.round(unit / scales[:, None]).astype(np.int8)
+            _atomic_save(os.path.join(index_dir, _SCALES_FILE), scales.astype(np.float32))
+        else:
+            matrix = unit.astype(np.float16)
+
+        _atomic_save(os.path.join(index_dir, _EMBEDDINGS_FILE), matrix)
+        _atomic_write_text(
+            os.path.join(index_dir, _CHUNKS_FILE),
+            "".join(
+                json.dumps({"text": t, "metadata": m}, ensure_ascii=False) + "\n"
+                for t, m in zip(texts, metadatas)
+            ),
+        )
+        # meta.json is written last: its presence marks the index as complete.
+        _atomic_write_text(
+            os.path.join(index_dir, _META_FILE),
+            json.dumps(
+                {
+                    "model": model,
+                    "dimensions": dimensions,
+                    "dtype": dtype,
+                    "count": len(texts),
+                    "dim": int(matrix.shape[1]),
+                }
+            ),
+        )
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        *,
+        index_dir: str,
+        model: str = "",
+        dtype: str = "float16",
+        dimensions: int | None = None,
+        **kwargs: Any,
+    ) -> "FlatVectorStore":
+        """Embed ``texts``, write a flat index to ``index_dir`` and open it."""
+        vectors = np.asarray(embedding.embed_documents(list(texts)), dtype=np.float32)
+        cls.write_index(
+            index_dir,
+            texts,
+            metadatas or [{} for _ in texts],
+            vectors,
+            model=model,
+            dtype=dtype,
+            dimensions=dimensions,
+        )
+        return cls(index_dir, embedding)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+
+    @property
+    def documents(self) -> list[Document]:
+        """Every stored chunk, in row order."""
+        return self._docs
+
+    def add_texts(self, texts: Iterable[str], metadatas: list[dict] | None = None, **kwargs: Any) -> list[str]:
+        raise NotImplementedError("FlatVectorStore is read-only; rebuild it with from_texts().")
+
+    def _scores(self, embedding: Sequence[float]) -> np.ndarray:
+        query = _normalise(np.asarray(embedding, dtype=np.float32))
+        if query.shape[0] != self._matrix.shape[1]:
+            raise ValueError(
+                f"Query has {query.shape[0]} dimensions but the index has {self._matrix.shape[1]}."
+            )
+        scores = self._matrix @ query
+        if self._scales is not None:
+            scores = scores * self._scales
+        return scores
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: Sequence[float], k: int = 4
+    ) -> list[tuple[Document, float]]:
+        scores = self._scores(embedding)
+        k = min(k, scores.shape[0])
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        # Unit vectors: squared L2 distance = 2 - 2·cosine.
+        return [(self._docs[i], max(0.0, float(2.0 - 2.0 * scores[i]))) for i in top]
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(
+            self._embedding_function.embed_query(query), k
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # Squared L2 between unit vectors lies in [0, 4]; map it onto [1, 0].
+        return lambda distance: 1.0 - distance / 4.0
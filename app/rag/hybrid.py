@@ -0,0 +1,141 @@
+"""
+Hybrid lexical + vector retrieval.
+
+A BM25 index is built over the same chunks as the vectorstore.  Each query
+runs both searches and the two rankings are combined with reciprocal-rank
+fusion (RRF), so exact terms such as policy names or SKU codes are found even
+when the embedding search ranks them low.
+
+Neighbouring chunks share up to 80 characters (the splitter's overlap);
+``overlap_length`` finds that shared text so app/rag/packing.py can stitch
+such chunks back together.
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, defaultdict
+
+from langchain_core.documents import Document
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Standard RRF constant – dampens the influence of top ranks.
+RRF_K = 60
+
+# Shorter shared prefixes/suffixes are treated as coincidence, not overlap.
+_MIN_OVERLAP = 20
+_MAX_OVERLAP = 80
+
+
+# Function words left out of BM25 queries; they occur in nearly every chunk
+# and would otherwise match any question.
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did",
+    "i", "my", "me", "we", "our", "you", "your", "it", "its", "they", "their",
+    "what", "which", "who", "how", "when", "where", "why", "can", "could",
+    "will", "would", "should", "to", "of", "for", "on", "in", "at", "by",
+    "from", "with", "and", "or", "not", "about", "there", "this", "that", "if",
+})
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens; keeps codes like 'prod003' intact."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents, held as an inverted index."""
+
+    def __init__(self, documents: list[Document], k1: float = 1.5, b: float = 0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._doc_len: list[int] = []
+        for i, doc in enumerate(documents):
+            tokens = tokenize(doc.page_content)
+            self._doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self._postings[term].append((i, tf))
+
+        n = len(documents)
+        self._avg_len = (sum(self._doc_len) / n) if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self._postings.items()
+        }
+
+    def search(self, query: str, k: int = 10) -> list[int]:
+        """Return indices of the top ``k`` documents for ``query``."""
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)) - STOPWORDS:
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self._postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self._doc_len[i] / self._avg_len)
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores, key=scores.__getitem__, reverse=True)[:k]
+
+
+def _stored_documents(vectorstore) -> list[Document]:
+    """Return every chunk held by a Chroma or flat vectorstore."""
+    if hasattr(vectorstore, "documents"):
+        return list(vectorstore.documents)
+    data = vectorstore.get(include=["documents", "metadatas"])
+    return [
+        Document(page_content=text, metadata=meta or {})
+        for text, meta in zip(data["documents"], data["metadatas"])
+    ]
+
+
+def overlap_length(prev: str, text: str) -> int:
+    """Length of the longest suffix of ``prev`` that is a prefix of ``text``."""
+    for size in range(min(len(prev), len(text), _MAX_OVERLAP), _MIN_OVERLAP - 1, -1):
+        if prev.endswith(text[:size]):
+            return size
+    return 0
+
+
+class HybridSearcher:
+    """Vectorstore wrapper that fuses vector and BM25 rankings with RRF.
+
+    Exposes ``similarity_search_with_score`` so it can stand in for the
+    vectorstore behind ``make_rag_search``.  Each ranker fetches ``fetch_k``
+    candidates before fusion.
+    """
+
+    def __init__(self, vectorstore, documents: list[Document], fetch_k: int = 10):
+        self.vectorstore = vectorstore
+        self.fetch_k = fetch_k
+        self.bm25 = BM25Index(documents)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, fetch_k: int = 10) -> "HybridSearcher":
+        return cls(vectorstore, _stored_documents(vectorstore), fetch_k=fetch_k)
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4
+    ) -> list[tuple[Document, float | None]]:
+        """Return the fused top ``k`` with each chunk's vector distance.
+
+        Chunks found only by BM25 have no distance and are scored None.
+        """
+        fused: dict[str, float] = defaultdict(float)
+        by_text: dict[str, Document] = {}
+
+        vector_hits = self.vectorstore.similarity_search_with_score(query, k=self.fetch_k)
+        distance = {doc.page_content: score for doc, score in vector_hits}
+        lexical_hits = [self.bm25.documents[i] for i in self.bm25.search(query, k=self.fetch_k)]
+
+        for ranking in ([doc for doc, _ in vector_hits], lexical_hits):
+            for rank, doc in enumerate(ranking):
+                # Keyed on text so the same chunk from both lists (or an
+                # identical chunk ingested twice) is only counted once.
+                fused[doc.page_content] += 1.0 / (RRF_K + rank + 1)
+                by_text.setdefault(doc.page_content, doc)
+
+        top = sorted(fused, key=fused.__getitem__, reverse=True)[:k]
+        return [(by_text[text], distance.get(text)) for text in top]
@@ -1,28 +1,108 @@
 """
 RAG ingestion: extract text from a PDF with pdfplumber, chunk it, embed with
-text-embedding-3-large, and persist to ChromaDB.
+text-embedding-3-large, and persist to ChromaDB or to a memory-mapped flat
+index (see app/rag/flat_index.py), depending on ``settings.vectorstore_backend``.
 
 On subsequent starts the existing persisted collection is reloaded, so
 re-embedding only happens once.
+
+Heavy dependencies (pdfplumber, chromadb, langchain) are imported inside the
+functions so importing this module stays cheap.
 """
+from __future__ import annotations
+
+import json
 import os
+import shutil
+from typing import TYPE_CHECKING
 
-import pdfplumber
-from langchain_chroma import Chroma
-from langchain_core.documents import Document
-from langchain_openai import OpenAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_core.documents import Document
 
+    from app.rag.flat_index import FlatVectorStore
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Return the full text of a PDF, page by page, using pdfplumber."""
-    pages: list[str] = []
+# Records the embedding model/dimensions a Chroma persist directory was built with
+_STAMP_FILE = "embedding_stamp.json"
+
+
+def extract_pages_from_pdf(pdf_path: str) -> list[tuple[int, str]]:
+    """Return ``(page_number, text)`` for every non-empty page, using pdfplumber."""
+    import pdfplumber
+
+    pages: list[tuple[int, str]] = []
     with pdfplumber.open(pdf_path) as pdf:
         for i, page in enumerate(pdf.pages):
             text = page.extract_text()
             if text and text.strip():
-                pages.append(f"[Page {i + 1}]\n{text.strip()}")
-    return "\n\n".join(pages)
+                pages.append((i + 1, f"[Page {i + 1}]\n{text.strip()}"))
+    return pages
+
+
+def extract_text_from_pdf(pdf_path: str) -> str:
+    """Return the full text of a PDF, page by page, using pdfplumber."""
+    return "\n\n".join(text for _, text in extract_pages_from_pdf(pdf_path))
+
+
+def split_pdf_into_documents(pdf_path: str) -> list[Document]:
+    """Extract a PDF and split it into overlapping chunks ready for embedding.
+
+    Each chunk records its ``page`` and a running ``chunk_index`` so adjacent
+    chunks can be stitched back into passages at query time.
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    print(f"[RAG] Ingesting PDF '{pdf_path}' …")
+    pages = extract_pages_from_pdf(pdf_path)
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=400,
+        chunk_overlap=80,
+        separators=["\n\n", "\n", ". ", " ", ""],
+    )
+    source = os.path.basename(pdf_path)
+    docs = splitter.create_documents(
+        [text for _, text in pages],
+        metadatas=[{"source": source, "page": number} for number, _ in pages],
+    )
+    for i, doc in enumerate(docs):
+        doc.metadata["chunk_index"] = i
+    return docs
+
+
+def make_embeddings(embedding_model: str, api_key: str, dimensions: int | None = None):
+    """Return the OpenAIEmbeddings client shared by ingestion and queries.
+
+    ``dimensions`` shortens text-embedding-3 vectors; None keeps the model's
+    native size.  Requests go through the process-wide HTTP pool.
+    """
+    from langchain_openai import OpenAIEmbeddings
+
+    from app.http_clients import get_http_clients
+
+    http_client, http_async_client = get_http_clients()
+    return OpenAIEmbeddings(
+        model=embedding_model,
+        dimensions=dimensions,
+        openai_api_key=api_key,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        # Otherwise the SDK's per-request None overrides the pool's timeout
+        request_timeout=http_async_client.timeout,
+    )
+
+
+def _read_stamp(persist_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(persist_dir, _STAMP_FILE), encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def _write_stamp(persist_dir: str, stamp: dict) -> None:
+    with open(os.path.join(persist_dir, _STAMP_FILE), "w", encoding="utf-8") as fh:
+        json.dump(stamp, fh)
 
 
 def load_or_create_vectorstore(
@@ -30,27 +110,35 @@ def load_or_create_vectorstore(
     persist_dir: str,
     embedding_model: str,
     api_key: str,
+    embedding_dimensions: int | None = None,
 ) -> Chroma:
-    """Return an existing ChromaDB vectorstore or create one by ingesting the PDF."""
-    embeddings = OpenAIEmbeddings(model=embedding_model, openai_api_key=api_key)
+    """Return an existing ChromaDB vectorstore or create one by ingesting the PDF.
+
+    The persist directory is stamped with the embedding model and dimensions.
+    If they no longer match the configuration, the store is rebuilt.
+    """
+    from langchain_chroma import Chroma
+
+    embeddings = make_embeddings(embedding_model, api_key, embedding_dimensions)
+    stamp = {"model": embedding_model, "dimensions": embedding_dimensions}
 
     # If the persist directory already has data, load it
     if os.path.isdir(persist_dir) and any(os.scandir(persist_dir)):
-        print(f"[RAG] Loading existing vectorstore from '{persist_dir}'")
-        return Chroma(persist_directory=persist_dir, embedding_function=embeddings)
+        existing = _read_stamp(persist_dir)
+        if existing is None:
+            # Stores created before stamping used the native model size.
+            existing = {"model": embedding_model, "dimensions": None}
+            if existing == stamp:
+                _write_stamp(persist_dir, stamp)
 
-    print(f"[RAG] Ingesting PDF '{pdf_path}' …")
-    raw_text = extract_text_from_pdf(pdf_path)
+        if existing == stamp:
+            print(f"[RAG] Loading existing vectorstore from '{persist_dir}'")
+            return Chroma(persist_directory=persist_dir, embedding_function=embeddings)
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=400,
-        chunk_overlap=80,
-        separators=["\n\n", "\n", ". ", " ", ""],
-    )
-    docs: list[Document] = splitter.create_documents(
-        [raw_text],
-        metadatas=[{"source": os.path.basename(pdf_path)}],
-    )
+        print(f"[RAG] Vectorstore at '{persist_dir}' was built with {existing}, need {stamp} – re-indexing")
+        shutil.rmtree(persist_dir)
+
+    docs = split_pdf_into_documents(pdf_path)
 
     print(f"[RAG] Created {len(docs)} chunks – embedding with '{embedding_model}' …")
     vectorstore = Chroma.from_documents(
@@ -58,5 +146,51 @@ def load_or_create_vectorstore(
         embeddings,
         persist_directory=persist_dir,
     )
+    _write_stamp(persist_dir, stamp)
     print(f"[RAG] Vectorstore persisted to '{persist_dir}' ✓")
     return vectorstore
+
+
+def load_or_create_flat_index(
+    pdf_path: str,
+    index_dir: str,
+    embedding_model: str,
+    api_key: str,
+    dtype: str = "float16",
+    embedding_dimensions: int | None = None,
+) -> FlatVectorStore:
+    """Return an existing memory-mapped flat index or create one by ingesting the PDF.
+
+    The index is rebuilt if its stamped model, dimensions or dtype no longer
+    match the configuration.
+    """
+    from app.rag.flat_index import FlatVectorStore, index_exists
+
+    embeddings = make_embeddings(embedding_model, api_key, embedding_dimensions)
+
+    if index_exists(index_dir):
+        store = FlatVectorStore(index_dir, embeddings)
+        built = (store.meta.get("model"), store.meta.get("dimensions"), store.meta.get("dtype"))
+        wanted = (embedding_model, embedding_dimensions, dtype)
+        if built == wanted:
+            print(f"[RAG] Memory-mapping flat index from '{index_dir}'")
+            return store
+        print(f"[RAG] Flat index at '{index_dir}' was built with {built}, need {wanted} – re-indexing")
+        # Release the memory maps before the files are replaced (Windows
+        # refuses to replace a file that is still mapped).
+        del store
+
+    docs = split_pdf_into_documents(pdf_path)
+
+    print(f"[RAG] Created {len(docs)} chunks – embedding with '{embedding_model}' …")
+    vectorstore = FlatVectorStore.from_texts(
+        [d.page_content for d in docs],
+        embeddings,
+        [d.metadata for d in docs],
+        index_dir=index_dir,
+        model=embedding_model,
+        dtype=dtype,
+        dimensions=embedding_dimensions,
+    )
+    print(f"[RAG] Flat index ({dtype}) persisted to '{index_dir}' ✓")
+    return vectorstore
@@ -0,0 +1,127 @@
+"""
+Context packing for retrieved chunks.
+
+Turns scored search hits into the text handed to the LLM:
+  1. drop hits whose distance is above a cutoff; lexical-only hits are kept
+     only when some vector hit is within it, so an off-topic query yields
+     nothing,
+  2. stitch adjacent or overlapping chunks of the same page back into one
+     contiguous passage,
+  3. add passages in relevance order until a token budget is filled.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+
+from langchain_core.documents import Document
+
+from app.rag.hybrid import overlap_length
+
+# Scored hit as returned by similarity_search_with_score.  Distance is None
+# for chunks found only by the lexical (BM25) search.
+Hit = tuple[Document, "float | None"]
+
+
+# Rough English average, used when the tiktoken encoding is unavailable.
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """Return the tiktoken encoding, or None if it cannot be loaded.
+
+    tiktoken downloads its BPE file on first use, which fails offline.
+    """
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    if enc is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(enc.encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    enc = _encoding()
+    if enc is None:
+        cut = text[: max_tokens * _CHARS_PER_TOKEN]
+    else:
+        tokens = enc.encode(text)
+        cut = enc.decode(tokens[:max_tokens])
+    return text if cut == text else cut.rstrip() + " …"
+
+
+def _follows(prev: Document, doc: Document) -> bool:
+    """True if ``doc`` continues ``prev`` in the source document."""
+    pm, dm = prev.metadata, doc.metadata
+    if "chunk_index" in pm and "chunk_index" in dm:
+        return (
+            pm.get("source") == dm.get("source")
+            and pm.get("page") == dm.get("page")
+            and dm["chunk_index"] == pm["chunk_index"] + 1
+        )
+    # Stores built before chunks carried positions: rely on the splitter overlap.
+    return overlap_length(prev.page_content, doc.page_content) > 0
+
+
+def merge_adjacent(hits: list[Hit]) -> list[str]:
+    """Stitch chained chunks into passages, ordered by their best-ranked chunk."""
+    successor: dict[int, int] = {}
+    has_predecessor: set[int] = set()
+    for i, (prev, _) in enumerate(hits):
+        for j, (doc, _) in enumerate(hits):
+            if i != j and j not in has_predecessor and _follows(prev, doc):
+                successor[i] = j
+                has_predecessor.add(j)
+                break
+
+    passages: list[tuple[int, str]] = []
+    seen: set[int] = set()
+    starts = [i for i in range(len(hits)) if i not in has_predecessor]
+    # Any chunk left over after walking chains is part of a cycle; emit it alone.
+    for start in starts + list(range(len(hits))):
+        if start in seen:
+            continue
+        chain = [start]
+        seen.add(start)
+        while chain[-1] in successor and successor[chain[-1]] not in seen:
+            chain.append(successor[chain[-1]])
+            seen.add(chain[-1])
+
+        text = hits[chain[0]][0].page_content
+        for idx in chain[1:]:
+            nxt = hits[idx][0].page_content
+            cut = overlap_length(text, nxt)
+            text = text + nxt[cut:] if cut else f"{text}\n{nxt}"
+        passages.append((min(chain), text))
+
+    passages.sort()
+    return [text for _, text in passages]
+
+
+def pack_passages(hits: list[Hit], token_budget: int, max_distance: float) -> list[str]:
+    """Filter, merge and budget ``hits`` (best first) into passages for the prompt."""
+    if not hits:
+        return []
+
+    if not any(score is not None and score <= max_distance for _, score in hits):
+        return []
+    kept = [(doc, score) for doc, score in hits if score is None or score <= max_distance]
+
+    packed: list[str] = []
+    used = 0
+    for text in merge_adjacent(kept):
+        size = count_tokens(text)
+        if used + size <= token_budget:
+            packed.append(text)
+            used += size
+        elif not packed:
+            packed.append(truncate_tokens(text, token_budget))
+            used = token_budget
+    return packed
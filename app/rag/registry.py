@@ -0,0 +1,328 @@
+"""
+Knowledge-base registry – several FAQ corpora (brands, locales) served from
+one deployment, each opened only when first asked for.
+
+Every knowledge base has its own PDF and its own persisted index directory.
+``use(name)`` hands out the loaded store; the first use starts loading it
+in a worker thread and waits up to ``load_wait`` seconds, after which the
+caller gets None ("still loading") while the load carries on in the
+background.  A failed load raises KnowledgeBaseUnavailable instead, and is
+not retried until ``retry_after`` seconds have passed.  Other knowledge
+bases are never touched, so one tenant's queries don't pay another's
+startup cost.
+
+At most ``max_resident`` stores stay open, and their estimated size (vectors
+plus chunk text, see ``estimate_bytes``) stays under ``memory_cap``; beyond
+either limit the least recently used store is evicted.  An evicted store is
+closed once the searches still using it finish, and reopened from disk on
+its next use.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from app import metrics
+
+# Vector width when EMBEDDING_DIMENSIONS is unset
+_NATIVE_DIMENSIONS = {
+    "text-embedding-3-large": 3072,
+    "text-embedding-3-small": 1536,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class UnknownKnowledgeBase(KeyError):
+    """Raised for a knowledge-base name that is not configured."""
+
+
+class KnowledgeBaseUnavailable(RuntimeError):
+    """Raised by ``use`` when a knowledge base failed to load."""
+
+    def __init__(self, name: str, error: str):
+        super().__init__(f"Knowledge base '{name}' failed to load: {error}")
+        self.name = name
+        self.error = error
+
+
+@dataclass(frozen=True)
+class KnowledgeBase:
+    """Where one knowledge base's source and indexes live."""
+
+    name: str
+    pdf_path: str
+    chroma_persist_dir: str
+    flat_index_dir: str
+
+
+def knowledge_bases_from_settings(settings) -> dict[str, KnowledgeBase]:
+    """The default knowledge base plus every entry of KNOWLEDGE_BASES.
+
+    The default keeps PDF_PATH, CHROMA_PERSIST_DIR and FLAT_INDEX_DIR, so
+    existing indexes are reused; the others are indexed under
+    ``KB_STORE_DIR/<name>/``.
+    """
+    default = settings.default_knowledge_base
+    bases = {
+        default: KnowledgeBase(
+            name=default,
+            pdf_path=settings.pdf_path,
+            chroma_persist_dir=settings.chroma_persist_dir,
+            flat_index_dir=settings.flat_index_dir,
+        )
+    }
+    for name, pdf_path in settings.knowledge_bases.items():
+        if name == default:
+            continue
+        root = os.path.join(settings.kb_store_dir, name)
+        bases[name] = KnowledgeBase(
+            name=name,
+            pdf_path=pdf_path,
+            chroma_persist_dir=os.path.join(root, "chroma"),
+            flat_index_dir=os.path.join(root, "flat"),
+        )
+    return bases
+
+
+def estimate_bytes(store, embedding_model: str, dimensions: int | None) -> int:
+    """Rough resident size of a loaded store.
+
+    One float32 vector per chunk (a flat index reports its actual matrix
+    size) plus the chunk text, counted twice when a BM25 index holds it too.
+    """
+    from app.rag.hybrid import _stored_documents
+
+    bm25 = getattr(store, "bm25", None)
+    vectorstore = getattr(store, "vectorstore", store)
+    documents = bm25.documents if bm25 is not None else _stored_documents(vectorstore)
+    text = sum(len(d.page_content.encode("utf-8")) for d in documents)
+
+    matrix = getattr(vectorstore, "_matrix", None)
+    if matrix is not None:
+        vectors = matrix.nbytes
+    else:
+        width = dimensions or _NATIVE_DIMENSIONS.get(embedding_model, 1536)
+        vectors = len(documents) * width * 4
+    return vectors + text * (2 if bm25 is not None else 1)
+
+
+def close_store(store) -> None:
+    """Release what a store holds open (Chroma's client and its caches)."""
+    vectorstore = getattr(store, "vectorstore", store)
+    client = getattr(vectorstore, "_client", None)
+    if client is not None and hasattr(client, "close"):
+        client.close()
+
+
+class _Resident:
+    __slots__ = ("store", "size", "leases", "evicted")
+
+    def __init__(self, store, size: int):
+        self.store = store
+        self.size = size
+        self.leases = 0
+        self.evicted = False
+
+
+class KnowledgeBaseRegistry:
+    """Lazily loaded, LRU-bounded set of knowledge-base stores."""
+
+    def __init__(
+        self,
+        bases: dict[str, KnowledgeBase],
+        loader: Callable[[KnowledgeBase], object],
+        default: str,
+        max_resident: int = 4,
+        memory_cap: int = 0,
+        load_wait: float = 10.0,
+        retry_after: float = 60.0,
+        size_of: Callable[[object], int] = lambda store: 0,
+    ):
+        self.bases = bases
+        self.default = default
+        self.max_resident = max_resident
+        self.memory_cap = memory_cap
+        self.load_wait = load_wait
+        self.retry_after = retry_after
+        self._loader = loader
+        self._size_of = size_of
+        self._lock = threading.Lock()
+        # Most recently used last
+        self._resident: OrderedDict[str, _Resident] = OrderedDict()
+        self._loading: dict[str, Future] = {}
+        self.errors: dict[str, str] = {}
+        # monotonic time of each knowledge base's last failed load
+        self._failed_at: dict[str, float] = {}
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kb-load")
+
+    def names(self) -> list[str]:
+        return list(self.bases)
+
+    def resolve(self, name: str | None) -> str:
+        """``name`` or the default; raises UnknownKnowledgeBase if not configured."""
+        name = name or self.default
+        if name not in self.bases:
+            raise UnknownKnowledgeBase(name)
+        return name
+
+    def is_loaded(self, name: str | None = None) -> bool:
+        return self.resolve(name) in self._resident
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _start_load(self, name: str) -> Future:
+        """Future for ``name``'s load, starting one if none is running (lock held)."""
+        future = self._loading.get(name)
+        if future is None:
+            self.errors.pop(name, None)
+            future = self._executor.submit(self._load, name)
+            self._loading[name] = future
+        return future
+
+    def _load(self, name: str):
+        started = time.monotonic()
+        try:
+            store = self._loader(self.bases[name])
+            size = self._size_of(store)
+        except Exception as exc:
+            with self._lock:
+                self.errors[name] = str(exc)
+                self._failed_at[name] = time.monotonic()
+                del self._loading[name]
+            metrics.incr("kb_load_errors")
+            raise
+
+        with self._lock:
+            self._resident[name] = _Resident(store, size)
+            del self._loading[name]
+            # Stores still in use are closed by use() when released
+            idle = [entry for entry in self._evict(keep=name) if entry.leases == 0]
+            self._update_gauges()
+        for entry in idle:
+            close_store(entry.store)
+        metrics.incr("kb_loads")
+        metrics.observe("kb_load_seconds", time.monotonic() - started)
+        return store
+
+    def load(self, name: str | None = None):
+        """Load ``name`` now (blocking) and return its store; errors propagate."""
+        name = self.resolve(name)
+        with self._lock:
+            resident = self._resident.get(name)
+            if resident is not None:
+                return resident.store
+            future = self._start_load(name)
+        return future.result()
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _evict(self, keep: str) -> list[_Resident]:
+        """Drop least recently used stores until both limits hold (lock held)."""
+        evicted = []
+
+        def over() -> bool:
+            if self.max_resident and len(self._resident) > self.max_resident:
+                return True
+            total = sum(r.size for r in self._resident.values())
+            return bool(self.memory_cap) and total > self.memory_cap
+
+        while over() and len(self._resident) > 1:
+            name = next(n for n in self._resident if n != keep)
+            entry = self._resident.pop(name)
+            entry.evicted = True
+            evicted.append(entry)
+            metrics.incr("kb_evictions")
+            print(f"[RAG] Evicted knowledge base '{name}' ({entry.size / 2**20:.1f} MB est.)")
+        return evicted
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("kb_resident", len(self._resident))
+        metrics.set_gauge("kb_resident_bytes", sum(r.size for r in self._resident.values()))
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def use(self, name: str | None = None) -> Iterator[object | None]:
+        """The store for ``name`` (default if None), or None while it is loading.
+
+        Loads it on first use, waiting up to ``load_wait`` seconds.  Raises
+        KnowledgeBaseUnavailable if the load failed, without starting another
+        until ``retry_after`` seconds after the failure.  The store is not
+        closed by eviction while the ``with`` block is running.
+        """
+        name = self.resolve(name)
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is None:
+                failed_at = self._failed_at.get(name)
+                if (
+                    name not in self._loading
+                    and failed_at is not None
+                    and time.monotonic() - failed_at < self.retry_after
+                ):
+                    raise KnowledgeBaseUnavailable(name, self.errors[name])
+                future = self._start_load(name)
+            else:
+                self._resident.move_to_end(name)
+                entry.leases += 1
+
+        if entry is None:
+            metrics.incr("kb_misses")
+            try:
+                future.result(timeout=self.load_wait)
+            except FutureTimeoutError:
+                pass  # still loading
+            except Exception as exc:
+                raise KnowledgeBaseUnavailable(name, str(exc)) from exc
+            with self._lock:
+                entry = self._resident.get(name)
+                if entry is not None:
+                    entry.leases += 1
+            if entry is None:
+                yield None
+                return
+        else:
+            metrics.incr("kb_hits")
+
+        try:
+            yield entry.store
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                release = entry.evicted and entry.leases == 0
+            if release:
+                close_store(entry.store)
+
+    def status(self) -> dict[str, str]:
+        """``loaded`` / ``loading`` / ``error`` / ``not loaded`` per knowledge base."""
+        with self._lock:
+            return {
+                name: (
+                    "loaded" if name in self._resident
+                    else "loading" if name in self._loading
+                    else "error" if name in self.errors
+                    else "not loaded"
+                )
+                for name in self.bases
+            }
+
+    def close(self) -> None:
+        """Close every resident store; called on application shutdown."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            resident, self._resident = list(self._resident.values()), OrderedDict()
+        for entry in resident:
+            close_store(entry.store)
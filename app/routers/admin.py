@@ -0,0 +1,45 @@
+"""
+Admin router – operational endpoints, enabled only when ADMIN_TOKEN is set:
+  POST /api/admin/catalog/reload → reload the product catalog from CATALOG_PATH
+
+Requests must send the token in the X-Admin-Token header.
+"""
+import asyncio
+import hmac
+
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+
+def _denied(token: str | None) -> JSONResponse | None:
+    from app.config import settings
+
+    if not settings.admin_token:
+        return JSONResponse({"detail": "Admin endpoints are disabled (ADMIN_TOKEN not set)."}, status_code=403)
+    if token is None or not hmac.compare_digest(token, settings.admin_token):
+        return JSONResponse({"detail": "Invalid admin token."}, status_code=401)
+    return None
+
+
+@router.post("/admin/catalog/reload")
+async def reload_catalog(x_admin_token: str | None = Header(default=None)):
+    from app.catalog import reload_catalog as _reload
+
+    if (denied := _denied(x_admin_token)) is not None:
+        return denied
+
+    # Built in a worker thread; requests keep using the old snapshot until
+    # the new one is swapped in.
+    try:
+        snapshot = await asyncio.to_thread(_reload)
+    except Exception as exc:
+        return JSONResponse({"detail": f"Catalog reload failed, keeping current catalog: {exc}"}, status_code=422)
+    return {
+        "status": "reloaded",
+        "source": snapshot.source,
+        "version": snapshot.version,
+        "products": len(snapshot.products),
+        "loaded_at": snapshot.loaded_at,
+    }
@@ -1,22 +1,30 @@
 """
-Chat router – exposes three endpoints:
-  POST /api/chat          → SSE stream of agent events
-  GET  /api/health        → simple health-check
+Chat router – exposes these endpoints:
+  POST /api/chat          → SSE stream of agent events (see app/routers/ws.py for WS /api/ws)
+  POST /api/chat/batch    → JSONL conversations in, JSONL results out (admin token)
+  GET  /api/health        → liveness check (process is up)
+  GET  /api/ready         → readiness check (agent and knowledge base loaded)
+  GET  /api/metrics       → in-process metrics snapshot
+  GET  /api/products      → full product catalog
+  GET  /api/products/facets → category/brand/price/rating counts + spec schema
   DELETE /api/sessions/{id} → clear a session's message history
 """
+import asyncio
+import contextlib
 import json
 import uuid
 from datetime import datetime
+from typing import AsyncIterator
 
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
-from langchain_core.messages import HumanMessage
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
-router = APIRouter()
+from app import metrics, sessions
+from app.concurrency import AdmissionRejected, get_admission, session_locks
 
-# In-memory session store: session_id → list[BaseMessage]
-sessions: dict[str, list] = {}
+router = APIRouter()
 
 
 # ---------------------------------------------------------------------------
@@ -26,6 +34,8 @@ sessions: dict[str, list] = {}
 class ChatRequest(BaseModel):
     message: str
     session_id: str | None = None
+    # Knowledge base for FAQ answers (brand/locale); None = the default
+    knowledge_base: str | None = None
 
 
 # ---------------------------------------------------------------------------
@@ -45,29 +55,142 @@ def _make_serializable(obj):
         return str(obj)
 
 
+async def _cancel_on_disconnect(http_request: Request, task: asyncio.Task, interval: float = 0.5) -> None:
+    """Cancel ``task`` once the client behind ``http_request`` disconnects."""
+    while not task.done():
+        if await http_request.is_disconnected():
+            task.cancel()
+            return
+        await asyncio.sleep(interval)
+
+
+def _not_ready() -> JSONResponse:
+    """503 for a request that arrives before the agent is built (or after it failed to be)."""
+    from app.main import warmup_error
+
+    if warmup_error is not None:
+        return JSONResponse({"detail": f"Agent failed to start: {warmup_error}"}, status_code=503)
+    return JSONResponse(
+        {"detail": "Agent is still starting up. Please retry shortly."},
+        status_code=503,
+        headers={"Retry-After": "2"},
+    )
+
+
+def _record_cancelled_turn(streamed_tokens: int) -> None:
+    """Count an abandoned turn and estimate the completion tokens it saved,
+    using the average streamed length of completed turns."""
+    metrics.incr("chat_cancelled_turns")
+    typical = metrics.average("chat_streamed_tokens")
+    metrics.incr("chat_tokens_saved_estimate", max(0.0, typical - streamed_tokens))
+
+
+def _emit_fast_path(frames: asyncio.Queue, turn, session_id: str) -> None:
+    """Send a fast-path answer using the same event shapes as the agent."""
+    events = [
+        {"type": "tool_start", "tool_name": turn.tool_name, "input": _make_serializable(turn.tool_args)},
+        {
+            "type": "tool_end",
+            "tool_name": turn.tool_name,
+            "output": turn.tool_output,
+            "timestamp": datetime.now().isoformat(),
+        },
+        {"type": "token", "content": turn.answer},
+        {
+            "type": "done",
+            "session_id": session_id,
+            "tool_trace": _make_serializable([turn.trace]),
+            "budget_exhausted": None,
+        },
+    ]
+    for payload in events:
+        frames.put_nowait(payload)
+
+
 # ---------------------------------------------------------------------------
-# Endpoints
+# Chat turn (shared by the SSE and WebSocket transports)
 # ---------------------------------------------------------------------------
 
-@router.post("/chat")
-async def chat(request: ChatRequest):
-    from app.main import graph  # imported here to avoid circular import at startup
+async def turn_events(
+    graph,
+    message: str,
+    session_id: str,
+    knowledge_base: str,
+    http_request: Request | None = None,
+) -> AsyncIterator[dict]:
+    """Run one chat turn, yielding its event payloads as they happen.
 
-    session_id = request.session_id or str(uuid.uuid4())
-    history: list = sessions.get(session_id, [])
+    Shared by the SSE and WebSocket transports; the caller holds the session
+    lock.  Closing or cancelling the consumer cancels the turn, which is then
+    rolled back.  With ``http_request`` the turn is also cancelled when that
+    client disconnects.
+    """
+    # The graph runs in its own task so it can be cancelled as soon as the
+    # client goes away – even mid-tool, when no frame is being sent.
+    frames: asyncio.Queue = asyncio.Queue()
+    streamed = {"tokens": 0}
+    runner = asyncio.create_task(
+        _run_turn(graph, frames, streamed, message, session_id, knowledge_base)
+    )
+    watcher = (
+        asyncio.create_task(_cancel_on_disconnect(http_request, runner))
+        if http_request is not None
+        else None
+    )
+    try:
+        while (payload := await frames.get()) is not None:
+            yield payload
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if not runner.done() or runner.cancelled():
+            if not runner.cancelling():
+                runner.cancel()
+            _record_cancelled_turn(streamed["tokens"])
+        # Wait for the rollback of a cancelled turn before the session
+        # lock is released.
+        await asyncio.gather(runner, return_exceptions=True)
 
-    all_messages = history + [HumanMessage(content=request.message)]
 
-    initial_state = {
-        "messages": all_messages,
-        "tool_trace": [],
-    }
+async def _run_turn(graph, frames: asyncio.Queue, streamed: dict, *turn) -> None:
+    try:
+        await _drive_graph(graph, frames, streamed, *turn)
+    finally:
+        frames.put_nowait(None)
 
-    async def generate():
-        final_output: dict | None = None
 
-        try:
-            async for event in graph.astream_events(initial_state, version="v2"):
+async def _drive_graph(
+    graph,
+    frames: asyncio.Queue,
+    streamed: dict,
+    message: str,
+    session_id: str,
+    knowledge_base: str,
+) -> None:
+    from app.agent.turn import AgentTurn, answer_fast_path
+
+    try:
+        fast = await answer_fast_path(graph, session_id, message)
+    except Exception as exc:
+        frames.put_nowait({"type": "error", "message": str(exc)})
+        frames.put_nowait(
+            {"type": "done", "session_id": session_id, "tool_trace": [], "budget_exhausted": None}
+        )
+        return
+    if fast is not None:
+        # Like the agent path, the turn is reported only once it is persisted.
+        _emit_fast_path(frames, fast, session_id)
+        return
+
+    final_output: dict | None = None
+    turn = AgentTurn(session_id, message, knowledge_base)
+    before = await sessions.head(graph, session_id)
+
+    try:
+        events = graph.astream_events(turn.input, turn.config, version="v2", durability="exit")
+        # aclosing: the graph writes its exit checkpoint before a rollback.
+        async with contextlib.aclosing(events):
+            async for event in events:
                 etype: str = event["event"]
                 ename: str = event.get("name", "")
                 edata: dict = event.get("data", {})
@@ -80,7 +203,7 @@ async def chat(request: ChatRequest):
                         "tool_name": ename,
                         "input": _make_serializable(raw_input),
                     }
-                    yield f"data: {json.dumps(payload)}\n\n"
+                    frames.put_nowait(payload)
 
                 # ---- Tool call completed ----
                 elif etype == "on_tool_end":
@@ -95,32 +218,91 @@ async def chat(request: ChatRequest):
                         "output": output_val,
                         "timestamp": datetime.now().isoformat(),
                     }
-                    yield f"data: {json.dumps(payload)}\n\n"
+                    frames.put_nowait(payload)
 
                 # ---- Streaming LLM tokens ----
                 elif etype == "on_chat_model_stream":
                     chunk = edata.get("chunk")
                     if chunk and hasattr(chunk, "content") and chunk.content:
+                        streamed["tokens"] += 1
                         payload = {"type": "token", "content": chunk.content}
-                        yield f"data: {json.dumps(payload)}\n\n"
+                        frames.put_nowait(payload)
 
-                # ---- Graph completed ----
-                elif etype == "on_chain_end":
+                # ---- Graph completed (root run only) ----
+                elif etype == "on_chain_end" and not event.get("parent_ids"):
                     output = edata.get("output", {})
                     if isinstance(output, dict) and "messages" in output:
                         final_output = output
 
-        except Exception as exc:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(exc)})}\n\n"
+    except Exception as exc:
+        frames.put_nowait({"type": "error", "message": str(exc)})
+    finally:
+        turn.discard()
+        if final_output is None:
+            # Failed or cancelled: drop the partial turn from the session.
+            await asyncio.shield(sessions.rollback(graph, session_id, before))
+
+    # ---- Send done event (the checkpointer has persisted the turn) ----
+    if final_output is not None:
+        tool_trace = _make_serializable(final_output.get("tool_trace", []))
+        turn.record(tool_trace, streamed["tokens"])
+        if turn.budget.fallback is not None:
+            # Fixed answers come from the node, not the model, so they
+            # are not streamed as tokens.
+            frames.put_nowait({"type": "token", "content": turn.budget.fallback})
+    else:
+        tool_trace = []
+
+    done = {
+        "type": "done",
+        "session_id": session_id,
+        "tool_trace": tool_trace,
+        "budget_exhausted": turn.budget.exhausted,
+    }
+    frames.put_nowait(done)
+
 
-        # ---- Persist session and send done event ----
-        if final_output is not None:
-            sessions[session_id] = list(final_output.get("messages", []))
-            tool_trace = _make_serializable(final_output.get("tool_trace", []))
-        else:
-            tool_trace = []
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+@router.post("/chat")
+async def chat(request: ChatRequest, http_request: Request):
+    from app.main import graph, knowledge_bases  # imported here to avoid circular import at startup
+    from app.rag.registry import UnknownKnowledgeBase
+
+    if graph is None:
+        return _not_ready()
+    try:
+        knowledge_base = knowledge_bases.resolve(request.knowledge_base)
+    except UnknownKnowledgeBase:
+        return JSONResponse(
+            {"detail": f"Unknown knowledge base '{request.knowledge_base}'."},
+            status_code=400,
+        )
+
+    client = http_request.client.host if http_request.client else "unknown"
+    try:
+        ticket = await get_admission().acquire(client)
+    except AdmissionRejected as exc:
+        return JSONResponse(
+            {"detail": str(exc)},
+            status_code=429,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
 
-        yield f"data: {json.dumps({'type': 'done', 'session_id': session_id, 'tool_trace': tool_trace})}\n\n"
+    session_id = request.session_id or str(uuid.uuid4())
+
+    async def generate():
+        try:
+            # Turns on one session run in arrival order; each starts from the
+            # checkpoint the previous turn left behind.
+            async with session_locks.hold(session_id):
+                events = turn_events(graph, request.message, session_id, knowledge_base, http_request)
+                async for payload in events:
+                    yield f"data: {json.dumps(payload)}\n\n"
+        finally:
+            await ticket.release()
 
     return StreamingResponse(
         generate(),
@@ -130,21 +312,109 @@ async def chat(request: ChatRequest):
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
         },
+        # Frees the slot even if the client disconnects before streaming starts.
+        background=BackgroundTask(ticket.release),
     )
 
 
+@router.post("/chat/batch")
+async def chat_batch(
+    http_request: Request,
+    parallelism: int | None = None,
+    x_admin_token: str | None = Header(default=None),
+):
+    """Run JSONL conversations (request body) and stream JSONL results; see app/batch.py.
+
+    Batch runs bypass chat admission control, so they need the admin token.
+    """
+    from app.main import graph  # imported here to avoid circular import at startup
+
+    from app.batch import run_batch
+    from app.config import settings
+    from app.routers.admin import _denied
+
+    if (denied := _denied(x_admin_token)) is not None:
+        return denied
+    if graph is None:
+        return _not_ready()
+
+    limit = max(1, min(parallelism or settings.batch_max_parallelism, settings.batch_max_parallelism))
+    # Read the whole body first: once the response starts, Starlette's
+    # disconnect listener owns receive() and the body can no longer be streamed.
+    lines = (await http_request.body()).decode("utf-8").splitlines()
+
+    async def generate():
+        async for result in run_batch(graph, lines, limit):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/health")
 async def health():
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
 
+@router.get("/ready")
+async def ready():
+    import app.main as main
+
+    if main.knowledge_base_ready:
+        knowledge_base = "ready"
+    elif main.vectorstore_error is not None:
+        knowledge_base = "failed"
+    else:
+        knowledge_base = "loading"
+
+    if main.warmup_error is not None:
+        status = "failed"
+    elif main.graph is None:
+        status = "starting"
+    elif knowledge_base == "failed":
+        status = "degraded"
+    else:
+        status = "ready" if knowledge_base == "ready" else "starting"
+
+    body = {
+        "status": status,
+        "agent": (
+            "ready" if main.graph is not None
+            else "failed" if main.warmup_error is not None
+            else "loading"
+        ),
+        "knowledge_base": knowledge_base,
+        "timestamp": datetime.now().isoformat(),
+    }
+    if main.warmup_error is not None:
+        body["error"] = main.warmup_error
+    elif main.vectorstore_error is not None:
+        body["error"] = main.vectorstore_error
+    if main.knowledge_bases is not None:
+        body["knowledge_bases"] = main.knowledge_bases.status()
+    return JSONResponse(body, status_code=200 if body["status"] == "ready" else 503)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
+
 @router.get("/products")
 async def list_products():
-    from app.agent.tools.catalog_tools import PRODUCT_CATALOG
-    return {"products": PRODUCT_CATALOG}
+    from app.catalog import aget_catalog
+
+    return {"products": [p.to_dict() for p in (await aget_catalog()).products]}
+
+
+@router.get("/products/facets")
+async def product_facets():
+    from app.catalog import aget_catalog
+
+    catalog = await aget_catalog()
+    return {"version": catalog.version, **catalog.facets.as_dict(include_schema=True)}
 
 
 @router.delete("/sessions/{session_id}")
 async def clear_session(session_id: str):
-    sessions.pop(session_id, None)
+    await sessions.delete_session(session_id)
     return {"status": "cleared", "session_id": session_id}
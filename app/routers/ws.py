@@ -0,0 +1,190 @@
+"""
+WebSocket router – one connection, many chat turns:
+  WS /api/ws → chat turns over a single socket (SSE at POST /api/chat stays the fallback)
+
+The client sends JSON text messages:
+
+  {"type": "chat", "message": "…", "session_id": "…", "knowledge_base": "…"}
+  {"type": "cancel"}
+
+``chat`` takes the same fields as POST /api/chat (no session_id starts a new
+session, reported in ``done``).  One turn runs at a time; ``cancel`` stops
+it mid-stream, rolls it back like a disconnected SSE stream, and is answered
+with ``{"type": "cancelled", "session_id": …}``.
+
+The server sends the SSE event payloads unchanged, one per frame.  Framing
+is picked with the WebSocket subprotocol:
+
+  chat.json    (default) every event is a JSON text frame
+  chat.compact token events are binary frames holding just the UTF-8 token
+               text; all other events stay JSON text frames
+
+Each turn goes through the same admission control and session lock as
+/api/chat; a rejected turn gets an ``error`` event with ``retry_after``.
+Every ``chat`` message ends with ``done`` (or ``cancelled``), also when it
+is rejected, so clients end a turn on those events only.
+"""
+import asyncio
+import contextlib
+import json
+import uuid
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app import metrics
+from app.concurrency import AdmissionRejected, get_admission, session_locks
+from app.routers.chat import ChatRequest, turn_events
+
+router = APIRouter()
+
+SUBPROTOCOLS = ("chat.compact", "chat.json")
+# "Try Again Later": the agent is still starting up
+_CLOSE_NOT_READY = 1013
+# "Internal Error": the agent failed to start
+_CLOSE_FAILED = 1011
+
+
+class _Sender:
+    """Serialises frames from the turn task and the receive loop."""
+
+    def __init__(self, websocket: WebSocket, compact: bool):
+        self._websocket = websocket
+        self._compact = compact
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, payload: dict) -> None:
+        async with self._lock:
+            if self._compact and payload["type"] == "token":
+                await self._websocket.send_bytes(payload["content"].encode("utf-8"))
+            else:
+                await self._websocket.send_text(json.dumps(payload))
+
+
+async def _run_turn(
+    graph,
+    send: _Sender,
+    answered: asyncio.Event,
+    client: str,
+    message: str,
+    session_id: str,
+    knowledge_base: str,
+) -> None:
+    """Stream one turn; ``answered`` is set once its last event has been sent."""
+    try:
+        ticket = await get_admission().acquire(client)
+    except AdmissionRejected as exc:
+        await _reject(send, {"type": "error", "message": str(exc), "retry_after": exc.retry_after}, session_id)
+        answered.set()
+        return
+    try:
+        async with session_locks.hold(session_id):
+            events = turn_events(graph, message, session_id, knowledge_base)
+            # aclosing: a cancel while a frame is being sent still rolls the turn back.
+            async with contextlib.aclosing(events):
+                async for payload in events:
+                    await send(payload)
+                    if payload["type"] == "done":
+                        answered.set()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await ticket.release()
+
+
+async def _reject(send: _Sender, error: dict, session_id: str | None) -> None:
+    """Answer a chat message that never became a turn: ``error``, then ``done``."""
+    await send(error)
+    await send({"type": "done", "session_id": session_id, "tool_trace": [], "budget_exhausted": None})
+
+
+def _parse(frame: dict) -> dict | None:
+    """The JSON object in a client text frame, or None."""
+    if frame.get("text") is None:
+        return None
+    try:
+        message = json.loads(frame["text"])
+    except json.JSONDecodeError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+@router.websocket("/ws")
+async def chat_ws(websocket: WebSocket):
+    from app.main import graph, knowledge_bases, warmup_error  # imported here to avoid circular import at startup
+    from app.rag.registry import UnknownKnowledgeBase
+
+    offered = websocket.scope.get("subprotocols", [])
+    subprotocol = next((p for p in SUBPROTOCOLS if p in offered), None)
+    await websocket.accept(subprotocol=subprotocol)
+    send = _Sender(websocket, compact=subprotocol == "chat.compact")
+
+    if warmup_error is not None:
+        await send({"type": "error", "message": f"Agent failed to start: {warmup_error}"})
+        await websocket.close(code=_CLOSE_FAILED)
+        return
+    if graph is None:
+        await send({"type": "error", "message": "Agent is still starting up. Please retry shortly."})
+        await websocket.close(code=_CLOSE_NOT_READY)
+        return
+
+    metrics.incr("ws_connections")
+    client = websocket.client.host if websocket.client else "unknown"
+    turn: asyncio.Task | None = None
+    answered = asyncio.Event()
+    session_id: str | None = None
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            message = _parse(frame)
+            if message is None:
+                await send({"type": "error", "message": "Expected a JSON object text frame."})
+                continue
+
+            if turn is not None and answered.is_set():
+                # ``done`` is out; the turn is only releasing its session lock.
+                await turn
+                turn = None
+
+            if message.get("type") == "cancel":
+                if turn is not None and not turn.done():
+                    metrics.incr("ws_cancel_requests")
+                    turn.cancel()
+                    # Reply once the rollback is done, so the next turn sees the old history.
+                    await asyncio.gather(turn, return_exceptions=True)
+                    await send({"type": "cancelled", "session_id": session_id})
+                continue
+            if message.get("type") != "chat":
+                await send({"type": "error", "message": f"Unknown message type {message.get('type')!r}."})
+                continue
+            if turn is not None and not turn.done():
+                await send({"type": "error", "message": "A turn is already running; send cancel first."})
+                continue
+
+            try:
+                request = ChatRequest.model_validate(message)
+                knowledge_base = knowledge_bases.resolve(request.knowledge_base)
+            except ValidationError as exc:
+                error = {"type": "error", "message": f"Invalid chat message: {exc.errors()[0]['msg']}"}
+                await _reject(send, error, message.get("session_id"))
+                continue
+            except UnknownKnowledgeBase:
+                error = {"type": "error", "message": f"Unknown knowledge base '{request.knowledge_base}'."}
+                await _reject(send, error, request.session_id)
+                continue
+
+            session_id = request.session_id or str(uuid.uuid4())
+            metrics.incr("ws_turns")
+            answered = asyncio.Event()
+            turn = asyncio.create_task(
+                _run_turn(graph, send, answered, client, request.message, session_id, knowledge_base)
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Client went away: stop the running turn and wait for its rollback.
+        if turn is not None:
+            turn.cancel()
+            await asyncio.gather(turn, return_exceptions=True)
@@ -0,0 +1,130 @@
+"""
+Conversation persistence – the agent graph is compiled with a LangGraph
+SQLite checkpointer and each chat session is one checkpoint thread
+(``thread_id = session_id``).
+
+The ``messages`` channel is a DeltaChannel (see app/agent/graph.py), so a
+turn writes only its new messages instead of a copy of the whole history,
+and the router sends just the new HumanMessage as graph input.  Graph runs
+use ``durability="exit"``: one checkpoint per turn rather than one per
+ReAct step.
+
+A turn that fails or is cancelled is rolled back by copying the pre-turn
+checkpoint as the thread's new head, so a half-finished tool call never
+reaches the next turn's history.
+
+Idle sessions cost only their stored bytes, so checkpoint and message blobs
+are compressed (zlib, or zstd with the optional ``zstandard`` package) and
+inflated when a session is next read.  The codec plugs into LangGraph's
+EncryptedSerializer, which tags each blob with its codec (``msgpack+zlib``)
+and keeps the msgpack allowlist in force; blobs written without compression
+still load.
+"""
+from __future__ import annotations
+
+import zlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+try:
+    import zstandard
+except ImportError:  # optional – zlib only
+    zstandard = None
+
+_conn = None
+_checkpointer: AsyncSqliteSaver | None = None
+
+# Below this a blob is stored as is; compression headers would outweigh gains
+_MIN_COMPRESS_SIZE = 128
+
+
+class BlobCodec:
+    """Compresses serialized checkpoint blobs (LangGraph CipherProtocol)."""
+
+    def __init__(self, method: str = "zlib", level: int | None = None):
+        if method not in ("zlib", "zstd"):
+            raise ValueError(f"Unknown session compression '{method}' (use zlib, zstd or none)")
+        if method == "zstd" and zstandard is None:
+            raise RuntimeError("SESSION_COMPRESSION=zstd requires the 'zstandard' package")
+        self.method = method
+        self.level = level if level is not None else (3 if method == "zstd" else 6)
+
+    def encrypt(self, plaintext: bytes) -> tuple[str, bytes]:
+        if len(plaintext) < _MIN_COMPRESS_SIZE:
+            return "raw", plaintext
+        if self.method == "zstd":
+            # (De)compressor objects are not thread-safe; they are cheap to create
+            return "zstd", zstandard.ZstdCompressor(level=self.level).compress(plaintext)
+        return "zlib", zlib.compress(plaintext, self.level)
+
+    def decrypt(self, ciphername: str, ciphertext: bytes) -> bytes:
+        if ciphername == "raw":
+            return ciphertext
+        if ciphername == "zlib":
+            return zlib.decompress(ciphertext)
+        if ciphername == "zstd":
+            if zstandard is None:
+                raise RuntimeError("Session data is zstd-compressed; install 'zstandard' to read it")
+            return zstandard.ZstdDecompressor().decompress(ciphertext)
+        raise ValueError(f"Unknown session blob codec '{ciphername}'")
+
+
+def make_serde(compression: str = "zlib"):
+    """Checkpoint serializer for ``compression`` ("zlib", "zstd" or "none")."""
+    from langgraph.checkpoint.serde.encrypted import EncryptedSerializer
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    if compression == "none":
+        return JsonPlusSerializer()
+    return EncryptedSerializer(BlobCodec(compression), JsonPlusSerializer())
+
+
+async def open_checkpointer(path: str, compression: str = "zlib") -> AsyncSqliteSaver:
+    """Open (creating if needed) the SQLite session store at ``path``."""
+    global _conn, _checkpointer
+
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    if _checkpointer is None:
+        _conn = await aiosqlite.connect(path)
+        await _conn.execute("PRAGMA journal_mode=WAL")
+        await _conn.execute("PRAGMA synchronous=NORMAL")
+        _checkpointer = AsyncSqliteSaver(_conn, serde=make_serde(compression))
+        await _checkpointer.setup()
+    return _checkpointer
+
+
+async def close_checkpointer() -> None:
+    """Close the session store; called on application shutdown."""
+    global _conn, _checkpointer
+    if _conn is not None:
+        await _conn.close()
+    _conn = _checkpointer = None
+
+
+def thread_config(session_id: str, **configurable) -> dict:
+    """Run config selecting ``session_id``'s checkpoint thread."""
+    return {"configurable": {"thread_id": session_id, **configurable}}
+
+
+async def head(graph, session_id: str) -> dict | None:
+    """Config of the session's latest checkpoint, or None for a new session."""
+    saved = await graph.checkpointer.aget_tuple(thread_config(session_id))
+    return saved.config if saved is not None else None
+
+
+async def rollback(graph, session_id: str, before: dict | None) -> None:
+    """Make ``before`` (from head()) the session's latest state again."""
+    if before is None:
+        await graph.checkpointer.adelete_thread(session_id)
+    else:
+        await graph.aupdate_state(before, None, as_node="__copy__")
+
+
+async def delete_session(session_id: str) -> None:
+    """Remove every checkpoint of ``session_id``."""
+    if _checkpointer is not None:
+        await _checkpointer.adelete_thread(session_id)
@@ -0,0 +1,154 @@
+"""
+Static UI assets served from memory with precompressed variants.
+
+At startup every file under ``static/`` is read once and compressed with
+gzip and, if the optional ``brotli`` package is installed, brotli.  A
+request gets the smallest variant its ``Accept-Encoding`` allows, so nothing
+is compressed per request.
+
+Each file has a strong ETag derived from a SHA-256 of its content (one per
+encoding, as the bytes differ).  Pages are served with ``Cache-Control:
+no-cache``: the browser keeps its copy and revalidates, getting a bodiless
+304 while the file is unchanged.  Every file is also reachable under a
+fingerprinted name – ``app.js`` as ``app.3f2a9c1d07be.js`` – and those
+responses are cacheable for a year (``immutable``), since a changed file
+gets a new name.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional – gzip only
+    brotli = None
+
+_FINGERPRINT_LENGTH = 12
+# Compressing tiny files saves nothing once headers are counted
+_MIN_COMPRESS_SIZE = 512
+
+_REVALIDATE = "no-cache"
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True, slots=True)
+class Asset:
+    media_type: str
+    digest: str
+    # Content-Encoding → body; "identity" is always present
+    bodies: dict[str, bytes]
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+
+def _compress(data: bytes) -> dict[str, bytes]:
+    bodies = {"identity": data}
+    if len(data) < _MIN_COMPRESS_SIZE:
+        return bodies
+    # mtime=0 keeps the gzip bytes (and so the ETag) stable across restarts
+    candidates = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates["br"] = brotli.compress(data, quality=11)
+    bodies.update({enc: body for enc, body in candidates.items() if len(body) < len(data)})
+    return bodies
+
+
+def load_asset(path: str) -> Asset:
+    with open(path, "rb") as f:
+        data = f.read()
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return Asset(media_type=media_type, digest=hashlib.sha256(data).hexdigest()[:32], bodies=_compress(data))
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Best encoding in ``available`` for an Accept-Encoding header.
+
+    Highest q-value wins; on a tie compression beats identity and brotli
+    beats gzip.  Identity is the fallback when nothing else is acceptable.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = "identity", weights.get("identity", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > 0 and (q > best_q or (best == "identity" and q == best_q)):
+            best, best_q = encoding, q
+    return best
+
+
+def _not_modified(if_none_match: str, asset: Asset) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(asset.etag(encoding) in tags for encoding in asset.bodies)
+
+
+class AssetStore:
+    """In-memory copy of a static directory, keyed by URL path."""
+
+    def __init__(self, directory: str):
+        self.assets: dict[str, Asset] = {}
+        # Fingerprinted name → plain name
+        self.fingerprints: dict[str, str] = {}
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, directory).replace(os.sep, "/")
+                asset = load_asset(path)
+                self.assets[name] = asset
+                self.fingerprints[self._fingerprinted(name, asset)] = name
+
+    @staticmethod
+    def _fingerprinted(name: str, asset: Asset) -> str:
+        stem, ext = os.path.splitext(name)
+        return f"{stem}.{asset.digest[:_FINGERPRINT_LENGTH]}{ext}"
+
+    def lookup(self, path: str) -> tuple[Asset, bool] | None:
+        """``(asset, immutable)`` for a request path, or None if unknown.
+
+        ``/`` maps to index.html and extension-less paths to ``<path>.html``.
+        """
+        path = path.strip("/") or "index.html"
+        if path in self.fingerprints:
+            return self.assets[self.fingerprints[path]], True
+        for name in (path, f"{path}.html"):
+            if name in self.assets:
+                return self.assets[name], False
+        return None
+
+    def response(self, request: Request, asset: Asset, immutable: bool) -> Response:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), asset.bodies)
+        headers = {
+            "ETag": asset.etag(encoding),
+            "Cache-Control": _IMMUTABLE if immutable else _REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _not_modified(if_none_match, asset):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
@@ -0,0 +1,87 @@
+"""
+Character-trigram index for typo-tolerant term lookup.
+
+Terms are padded (``$term$``) and split into trigrams.  A misspelt word is
+looked up by counting the trigrams it shares with each term: an edit changes
+at most three trigrams, so a term within ``k`` edits must share at least
+``len(trigrams) - 3k`` of them.  Candidates passing that filter (and a
+length check) are verified with a Levenshtein distance that gives up as soon
+as every cell in a row exceeds ``k``.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable
+
+
+def trigrams(term: str) -> list[str]:
+    padded = f"${term}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int | None:
+    """Levenshtein distance between ``a`` and ``b``, or None if it exceeds ``max_distance``."""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+        if min(current) > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def max_edits(word: str) -> int:
+    """Edits tolerated for a word of this length (none below 4 characters)."""
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+class TrigramIndex:
+    """Maps misspelt words to the closest known term."""
+
+    def __init__(self, terms: Iterable[str]):
+        # Term frequency breaks ties between equally close candidates.
+        self.frequency: Counter = Counter(terms)
+        self.terms: list[str] = list(self.frequency)
+        self.postings: dict[str, list[int]] = {}
+        for term_id, term in enumerate(self.terms):
+            for gram in set(trigrams(term)):
+                self.postings.setdefault(gram, []).append(term_id)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.frequency
+
+    def correct(self, word: str) -> str | None:
+        """Closest indexed term within ``max_edits(word)`` edits, or None."""
+        k = max_edits(word)
+        if k == 0 or word in self.frequency:
+            return None
+
+        grams = set(trigrams(word))
+        shared: Counter = Counter()
+        for gram in grams:
+            for term_id in self.postings.get(gram, ()):
+                shared[term_id] += 1
+
+        needed = max(1, len(grams) - 3 * k)
+        best: tuple[int, int, str] | None = None
+        for term_id, count in shared.items():
+            if count < needed:
+                continue
+            term = self.terms[term_id]
+            distance = bounded_edit_distance(word, term, k)
+            if distance is None:
+                continue
+            key = (distance, -self.frequency[term], term)
+            if best is None or key < best:
+                best = key
+        return best[2] if best else None
@@ -0,0 +1,80 @@
+"""
+Cold-start benchmark – time from launching uvicorn to the first successful
+request, and to the app reporting ready.
+
+    python benchmarks/cold_start.py [--runs 5] [--port 8765]
+
+A dummy OPENAI_API_KEY is used if none is set; loading an existing persisted
+vectorstore does not call the OpenAI API.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+def _wait_for(url: str, deadline: float) -> bool:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    return False
+
+
+def run_once(port: int, timeout: float) -> tuple[float, float | None]:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    base = f"http://127.0.0.1:{port}/api"
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        if not _wait_for(f"{base}/health", deadline):
+            raise RuntimeError("server did not answer /api/health in time")
+        first_request = time.perf_counter() - start
+        ready = time.perf_counter() - start if _wait_for(f"{base}/ready", deadline) else None
+        return first_request, ready
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    first, ready = [], []
+    for i in range(args.runs):
+        f, r = run_once(args.port, args.timeout)
+        first.append(f)
+        if r is not None:
+            ready.append(r)
+        print(f"run {i + 1}: first request {f:.2f}s, ready {r:.2f}s" if r else f"run {i + 1}: first request {f:.2f}s")
+
+    print(f"\nfirst request  median {statistics.median(first):.2f}s")
+    if ready:
+        print(f"ready          median {statistics.median(ready):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Memory per booking and per idle session at 100k scale.
+
+    python benchmarks/compact_storage.py [--bookings 100000] [--sessions 100000] [--turns 5]
+
+Bookings – the old dict records (ISO timestamps, per-booking strings) vs the
+slotted Appointment records in calendar_tools, measured with tracemalloc.
+
+Sessions – a synthetic history of ``--turns`` catalog questions, each
+question → tool call → search_products result → answer (4 messages):
+
+  objects   – LangChain message objects, as a resident history holds them
+              (tracemalloc over a 1,000-session sample)
+  msgpack   – the checkpointer's serialized blob
+  zlib/zstd – the same blob through the session store's BlobCodec
+
+For blobs, bytes per session are summed over every session.  Blobs are held
+as bytes in memory, so this also counts as their resident size (+33 bytes
+object header each).  ``inflate`` is the mean time to decompress and
+deserialize one session.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+
+from app.agent.tools.calendar_tools import TIMEZONE, Appointment  # noqa: E402
+from app.catalog import get_catalog  # noqa: E402
+from app.sessions import make_serde, zstandard  # noqa: E402
+
+_SERVICES = ["Product Demo", "Consultation", "General", "Repair Intake", "Setup Assistance"]
+_SLOTS = ["09:00", "10:00", "11:00", "12:00", "14:00", "15:00", "16:00", "17:00"]
+_FIRST = ["Sara", "Omar", "Lina", "Yusuf", "Maya", "Khalid", "Noor", "Adam"]
+_LAST = ["Haddad", "Rahman", "Saleh", "Nasser", "Karim", "Aziz"]
+
+
+def _traced(build):
+    """Bytes allocated (and still live) by ``build()``, and its result."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+# ---------------------------------------------------------------------------
+# Bookings
+# ---------------------------------------------------------------------------
+
+def _booking_fields(rng: random.Random, i: int) -> dict:
+    day = (datetime(2026, 1, 1) + timedelta(days=rng.randrange(365))).strftime("%Y-%m-%d")
+    created = datetime(2026, 1, 1, tzinfo=TIMEZONE) + timedelta(seconds=rng.randrange(30_000_000))
+    return {
+        "booking_id": f"BK{uuid.UUID(int=rng.getrandbits(128)).hex[:8].upper()}",
+        "date": day,
+        "time_slot": rng.choice(_SLOTS),
+        # Tool arguments arrive as fresh strings from the model's JSON
+        "service": "".join(rng.choice(_SERVICES)),
+        "customer_name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)} {i}",
+        "customer_email": "",
+        "notes": "",
+        "created": created,
+    }
+
+
+def _old_bookings(count: int) -> dict:
+    rng = random.Random(1)
+    store = {}
+    for i in range(count):
+        f = _booking_fields(rng, i)
+        store[f["booking_id"]] = {
+            "booking_id": f["booking_id"],
+            "date": f["date"],
+            "time_slot": f["time_slot"],
+            "service": f["service"],
+            "customer_name": f["customer_name"],
+            "customer_email": f["customer_email"],
+            "notes": f["notes"],
+            "status": "confirmed",
+            "created_at": f["created"].isoformat(),
+        }
+    return store
+
+
+def _new_bookings(count: int) -> dict:
+    rng = random.Random(1)
+    store = {}
+    for i in range(count):
+        f = _booking_fields(rng, i)
+        store[f["booking_id"]] = Appointment(
+            booking_id=f["booking_id"],
+            date=sys.intern(f["date"]),
+            time_slot=sys.intern(f["time_slot"]),
+            service=sys.intern(f["service"]),
+            customer_name=f["customer_name"],
+            customer_email=f["customer_email"],
+            notes=f["notes"],
+            status="confirmed",
+            created_at=int(f["created"].timestamp()),
+        )
+    return store
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+def _session(rng: random.Random, products, turns: int) -> list:
+    messages = []
+    for t in range(turns):
+        product = rng.choice(products)
+        query = f"{product.brand} {product.category}".lower()
+        call_id = f"call_{uuid.UUID(int=rng.getrandbits(128)).hex[:24]}"
+        hits = [p for p in products if p.category == product.category][:3]
+        result = {
+            "results": [
+                {"id": p.id, "name": p.name, "category": p.category, "price": p.price,
+                 "rating": p.rating, "stock": p.stock, "description": p.description}
+                for p in hits
+            ],
+            "total_matches": len(hits),
+        }
+        messages += [
+            HumanMessage(content=f"Do you have any {query} under ${int(product.price * 1.2)}? ({t})"),
+            AIMessage(content="", tool_calls=[{"name": "search_products", "args": {"query": query}, "id": call_id}]),
+            ToolMessage(content=str(result), tool_call_id=call_id, name="search_products"),
+            AIMessage(content=(
+                f"Yes – the **{product.name}** by {product.brand} is ${product.price:.2f} and rated "
+                f"{product.rating}/5. {product.description} It is in stock ({product.stock} left). "
+                "Would you like to compare it with a similar model or book a demo?"
+            )),
+        ]
+    return messages
+
+
+def _session_blobs(count: int, turns: int, serdes: dict) -> dict:
+    products = list(get_catalog().products)
+    rng = random.Random(2)
+    totals = {name: 0 for name in serdes}
+    samples = {name: [] for name in serdes}
+    for i in range(count):
+        messages = _session(rng, products, turns)
+        for name, serde in serdes.items():
+            blob = serde.dumps_typed(messages)
+            totals[name] += len(blob[1])
+            if i < 1000:
+                samples[name].append(blob)
+    inflate = {}
+    for name, serde in serdes.items():
+        t0 = time.perf_counter()
+        for blob in samples[name]:
+            serde.loads_typed(blob)
+        inflate[name] = (time.perf_counter() - t0) / len(samples[name])
+    return {name: (totals[name] / count, inflate[name]) for name in serdes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Bookings ({args.bookings:,})")
+    for name, build in (("dict records", _old_bookings), ("Appointment", _new_bookings)):
+        size, _ = _traced(lambda: build(args.bookings))
+        print(f"  {name:<14}{size / args.bookings:>8.0f} B/booking{size / 2**20:>10.1f} MB")
+
+    print(f"\nIdle sessions ({args.sessions:,} × {args.turns} turns, {args.turns * 4} messages)")
+    products = list(get_catalog().products)
+    rng = random.Random(2)
+    sample = min(1000, args.sessions)
+    size, _ = _traced(lambda: [_session(rng, products, args.turns) for _ in range(sample)])
+    per_session = size / sample
+    print(f"  {'objects':<14}{per_session:>8.0f} B/session{per_session * args.sessions / 2**20:>10.1f} MB")
+
+    serdes = {"msgpack": make_serde("none"), "zlib": make_serde("zlib")}
+    if zstandard is not None:
+        serdes["zstd"] = make_serde("zstd")
+    for name, (per_session, inflate) in _session_blobs(args.sessions, args.turns, serdes).items():
+        print(
+            f"  {name:<14}{per_session:>8.0f} B/session{per_session * args.sessions / 2**20:>10.1f} MB"
+            f"   inflate {inflate * 1e6:.0f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Index size, query latency and retrieval quality at several embedding sizes.
+
+    python benchmarks/embedding_dimensions.py [--dims 256 512 1024 1536 3072]
+
+text-embedding-3 vectors shortened through the API's ``dimensions`` parameter
+equal the full vector truncated and L2-renormalised, so the stored 3072-d
+chunk embeddings in CHROMA_PERSIST_DIR are truncated here instead of calling
+OpenAI.  Quality is the leave-one-out overlap of each chunk's top-k
+neighbours with its full-size neighbours.  Latency covers Chroma and the
+float16 flat index (app/rag/flat_index.py).
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.rag.flat_index import FlatVectorStore  # noqa: E402
+
+
+def _dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files
+    )
+
+
+def _truncate(vectors: np.ndarray, dim: int) -> np.ndarray:
+    cut = vectors[:, :dim]
+    return cut / np.linalg.norm(cut, axis=1, keepdims=True)
+
+
+def _neighbours(unit: np.ndarray, k: int) -> list[set[int]]:
+    sims = unit @ unit.T
+    np.fill_diagonal(sims, -np.inf)
+    return [set(np.argsort(-row)[:k]) for row in sims]
+
+
+def _median_ms(search, queries) -> float:
+    search(queries[0])  # warm-up
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        search(q)
+        lat.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(lat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chroma-dir", default=os.environ.get("CHROMA_PERSIST_DIR", "./chroma_db_v2"))
+    parser.add_argument("--dims", type=int, nargs="+", default=[256, 512, 1024, 1536, 3072])
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    import chromadb
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "source")
+        shutil.copytree(args.chroma_dir, src)
+        collection = chromadb.PersistentClient(path=src).list_collections()[0]
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        vectors = np.asarray(data["embeddings"], dtype=np.float32)
+        texts = list(data["documents"])
+        metadatas = [dict(m or {}) for m in data["metadatas"]]
+        n, full_dim = vectors.shape
+        print(f"{n} chunks, native size {full_dim}\n")
+
+        reference = _neighbours(_truncate(vectors, full_dim), args.k)
+        rng = np.random.default_rng(0)
+        picks = rng.integers(0, n, args.queries)
+
+        print(
+            f"{'dims':>6}{'overlap@' + str(args.k):>12}{'flat KiB':>10}{'chroma KiB':>12}"
+            f"{'flat ms':>10}{'chroma ms':>11}"
+        )
+        for dim in args.dims:
+            unit = _truncate(vectors, dim)
+            found = _neighbours(unit, args.k)
+            overlap = sum(len(a & b) for a, b in zip(found, reference)) / (n * args.k)
+
+            flat_dir = os.path.join(tmp, f"flat_{dim}")
+            FlatVectorStore.write_index(flat_dir, texts, metadatas, unit, model="bench", dimensions=dim)
+            flat = FlatVectorStore(flat_dir, embedding_function=None)
+
+            chroma_dir = os.path.join(tmp, f"chroma_{dim}")
+            col = chromadb.PersistentClient(path=chroma_dir).create_collection("bench")
+            col.add(ids=[str(i) for i in range(n)], embeddings=unit, documents=texts)
+
+            queries = unit[picks]
+            flat_ms = _median_ms(lambda q: flat.similarity_search_by_vector(q, k=args.k), queries)
+            chroma_ms = _median_ms(lambda q: col.query(query_embeddings=[q], n_results=args.k), queries)
+
+            print(
+                f"{dim:>6}{overlap:>12.3f}{_dir_size(flat_dir) / 1024:>10.0f}"
+                f"{_dir_size(chroma_dir) / 1024:>12.0f}{flat_ms:>10.3f}{chroma_ms:>11.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
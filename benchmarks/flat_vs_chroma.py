@@ -0,0 +1,106 @@
+"""
+Recall / latency comparison: Chroma (SQLite + HNSW) vs the flat memory-mapped
+index (float16 and int8).
+
+    python benchmarks/flat_vs_chroma.py [--queries 500] [--k 4]
+
+The chunk embeddings already persisted in CHROMA_PERSIST_DIR are reused, so no
+OpenAI calls are made.  Queries are noisy copies of stored chunk vectors and
+ground truth is an exact float32 brute-force search.  The Chroma directory is
+copied to a temporary location first so the original is left untouched.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.rag.flat_index import FlatVectorStore  # noqa: E402
+
+
+class _NoEmbeddings:
+    """Placeholder embedding function – the benchmark only searches by vector."""
+
+    def embed_query(self, text):
+        raise RuntimeError("not used")
+
+    def embed_documents(self, texts):
+        raise RuntimeError("not used")
+
+
+def _time_queries(search, queries, k):
+    results, latencies = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append(search(q, k))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return results, latencies
+
+
+def _recall(found: list[list[str]], truth: list[list[str]]) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / sum(len(t) for t in truth)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chroma-dir", default=os.environ.get("CHROMA_PERSIST_DIR", "./chroma_db_v2"))
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--noise", type=float, default=0.02)
+    args = parser.parse_args()
+
+    from langchain_chroma import Chroma
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chroma_dir = os.path.join(tmp, "chroma")
+        shutil.copytree(args.chroma_dir, chroma_dir)
+        chroma = Chroma(persist_directory=chroma_dir, embedding_function=_NoEmbeddings())
+
+        data = chroma.get(include=["embeddings", "documents", "metadatas"])
+        ids = list(data["ids"])
+        vectors = np.asarray(data["embeddings"], dtype=np.float32)
+        texts = list(data["documents"])
+        metadatas = [dict(m or {}, chunk_id=i) for m, i in zip(data["metadatas"], ids)]
+        print(f"{len(ids)} chunks × {vectors.shape[1]} dims\n")
+
+        rng = np.random.default_rng(0)
+        base = vectors[rng.integers(0, len(ids), args.queries)]
+        queries = base + rng.normal(0, args.noise, base.shape).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        truth = [[ids[i] for i in np.argsort(-(unit @ q))[: args.k]] for q in queries]
+
+        def chroma_search(q, k):
+            return [d.id for d in chroma.similarity_search_by_vector(q.tolist(), k=k)]
+
+        backends = {"chroma (hnsw)": chroma_search}
+        for dtype in ("float16", "int8"):
+            index_dir = os.path.join(tmp, f"flat_{dtype}")
+            FlatVectorStore.write_index(index_dir, texts, metadatas, vectors, model="bench", dtype=dtype)
+            store = FlatVectorStore(index_dir, _NoEmbeddings())
+            size = sum(os.path.getsize(os.path.join(index_dir, f)) for f in os.listdir(index_dir))
+
+            def flat_search(q, k, store=store):
+                return [d.metadata["chunk_id"] for d in store.similarity_search_by_vector(q, k=k)]
+
+            backends[f"flat {dtype} ({size / 1024:.0f} KiB)"] = flat_search
+
+        print(f"{'backend':<28}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, search in backends.items():
+            search(queries[0], args.k)  # warm-up
+            found, lat = _time_queries(search, queries, args.k)
+            lat.sort()
+            p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+            print(f"{name:<28}{_recall(found, truth):>10.3f}{statistics.median(lat):>10.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Shared HTTP pool vs OpenAI SDK defaults, against a local stub server.
+
+    python benchmarks/http_pool.py [--concurrency 8] [--bursts 4] [--idle 6]
+
+A stub OpenAI-compatible /v1/embeddings endpoint runs in a child process and
+counts the TCP connections it accepts.  Traffic arrives in bursts separated by idle
+gaps, like chat turns; the SDK default pool drops connections idle for more
+than 5 s, so every burst re-opens them.  The stub adds a fixed per-connection
+setup delay to stand in for the TCP + TLS handshake to api.openai.com.
+"""
+import argparse
+import asyncio
+import os
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.http_clients import build_http_clients  # noqa: E402
+
+_connections: set[tuple[str, int]] = set()
+
+
+def _make_stub(handshake_ms: float, latency_ms: float):
+    from fastapi import FastAPI, Request
+
+    stub = FastAPI()
+
+    @stub.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        client = request.client
+        key = (client.host, client.port)
+        if key not in _connections:
+            _connections.add(key)
+            await asyncio.sleep(handshake_ms / 1000)
+        await asyncio.sleep(latency_ms / 1000)
+        return {
+            "object": "list",
+            "data": [{"object": "embedding", "index": 0, "embedding": [0.1] * 16}],
+            "model": "stub",
+            "usage": {"prompt_tokens": 1, "total_tokens": 1},
+        }
+
+    @stub.get("/stats")
+    async def stats():
+        return {"connections": len(_connections)}
+
+    @stub.post("/reset")
+    async def reset():
+        _connections.clear()
+        return {}
+
+    return stub
+
+
+def _serve(port: int, handshake_ms: float, latency_ms: float) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        _make_stub(handshake_ms, latency_ms), port=port, log_level="warning", timeout_keep_alive=300
+    )
+
+
+def _start_server(args) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [
+            sys.executable, __file__, "--serve",
+            "--port", str(args.port),
+            "--handshake-ms", str(args.handshake_ms),
+            "--latency-ms", str(args.latency_ms),
+        ]
+    )
+    for _ in range(200):
+        try:
+            _stub_call(args.port, "stats")
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("stub server did not start")
+
+
+def _stub_call(port: int, path: str) -> dict:
+    method = "POST" if path == "reset" else "GET"
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/{path}", method=method)
+    with urllib.request.urlopen(req, timeout=2) as resp:
+        return json.loads(resp.read())
+
+
+async def _run(embeddings, concurrency: int, bursts: int, idle: float) -> list[float]:
+    latencies: list[float] = []
+
+    async def one():
+        t0 = time.perf_counter()
+        await embeddings.aembed_query("hello")
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    for i in range(bursts):
+        if i:
+            await asyncio.sleep(idle)
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--bursts", type=int, default=4)
+    parser.add_argument("--idle", type=float, default=6.0)
+    parser.add_argument("--handshake-ms", type=float, default=80.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.port, args.handshake_ms, args.latency_ms)
+        return
+
+    from langchain_openai import OpenAIEmbeddings
+
+    server = _start_server(args)
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    common = dict(
+        model="stub", base_url=base_url, api_key="sk-stub", check_embedding_ctx_length=False
+    )
+
+    _, shared_async = build_http_clients(
+        max_connections=100,
+        max_keepalive=40,
+        keepalive_expiry=120.0,
+        timeout=60.0,
+        connect_timeout=5.0,
+        retries=2,
+    )
+    scenarios = {
+        "sdk defaults": OpenAIEmbeddings(**common),
+        "shared pool": OpenAIEmbeddings(**common, http_async_client=shared_async),
+    }
+
+    print(f"{'client':<16}{'connections':>12}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    try:
+        for name, embeddings in scenarios.items():
+            _stub_call(args.port, "reset")
+            lat = sorted(asyncio.run(_run(embeddings, args.concurrency, args.bursts, args.idle)))
+            p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+            connections = _stub_call(args.port, "stats")["connections"]
+            print(
+                f"{name:<16}{connections:>12}{statistics.median(lat):>10.1f}"
+                f"{p99:>10.1f}{lat[-1]:>10.1f}"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Per-turn session persistence overhead over long conversations.
+
+    python benchmarks/session_persistence.py [--turns 100] [--sessions 3]
+
+Runs a stub ReAct loop (agent → tools → agent, ~1 KB tool output, no LLM) so
+only state handling is timed:
+
+  in-memory copy   – the old router: history + [HumanMessage] in, list(output)
+                     stored back in a dict
+  sqlite, full     – SQLite checkpointer with a plain add_messages channel;
+                     every checkpoint carries the whole history
+  sqlite, delta    – the app's AgentState (DeltaChannel messages), new message
+                     in, durability="exit"
+
+Reports mean per-turn time for the first and last 10 turns and the bytes
+written to SQLite per turn.
+"""
+import argparse
+import asyncio
+import operator
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Annotated, TypedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+from langgraph.graph.message import add_messages  # noqa: E402
+from langgraph.types import Overwrite  # noqa: E402
+
+from app.agent.graph import AgentState  # noqa: E402
+
+_TOOL_OUTPUT = "Returns are accepted within 14 days of delivery. " * 20
+
+
+class FullState(TypedDict):
+    messages: Annotated[list, add_messages]
+    tool_trace: Annotated[list, operator.add]
+
+
+def _graph(state_type, checkpointer=None):
+    async def agent(state):
+        last = state["messages"][-1]
+        if isinstance(last, HumanMessage):
+            call = {"name": "search_knowledge_base", "args": {"query": last.content}, "id": f"c{len(state['messages'])}"}
+            return {"messages": [AIMessage(content="", tool_calls=[call])]}
+        return {"messages": [AIMessage(content="Here is what I found. " * 10)]}
+
+    async def tools(state):
+        call = state["messages"][-1].tool_calls[0]
+        return {
+            "messages": [ToolMessage(content=_TOOL_OUTPUT, tool_call_id=call["id"], name=call["name"])],
+            "tool_trace": [{"tool_name": call["name"]}],
+        }
+
+    def route(state):
+        return "tools" if getattr(state["messages"][-1], "tool_calls", None) else END
+
+    g = StateGraph(state_type)
+    g.add_node("agent", agent)
+    g.add_node("tools", tools)
+    g.add_edge(START, "agent")
+    g.add_conditional_edges("agent", route, {"tools": "tools", END: END})
+    g.add_edge("tools", "agent")
+    return g.compile(checkpointer=checkpointer)
+
+
+async def _in_memory(turns: int, sid: str, store: dict) -> list[float]:
+    graph = _graph(FullState)
+    times = []
+    for i in range(turns):
+        t0 = time.perf_counter()
+        history = store.get(sid, [])
+        out = await graph.ainvoke({"messages": history + [HumanMessage(f"question {i}")], "tool_trace": []})
+        store[sid] = list(out["messages"])
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+async def _checkpointed(graph, turns: int, sid: str, delta: bool) -> list[float]:
+    config = {"configurable": {"thread_id": sid}}
+    times = []
+    for i in range(turns):
+        t0 = time.perf_counter()
+        turn_input = {"messages": [HumanMessage(f"question {i}")], "tool_trace": Overwrite([])}
+        if delta:
+            await graph.ainvoke(turn_input, config, durability="exit")
+        else:
+            await graph.ainvoke(turn_input, config)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+async def _open_saver(path: str):
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    conn = await aiosqlite.connect(path)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    saver = AsyncSqliteSaver(conn)
+    await saver.setup()
+    return conn, saver
+
+
+async def _stored_bytes(conn) -> int:
+    total = 0
+    for sql in ("SELECT SUM(LENGTH(checkpoint)) FROM checkpoints", "SELECT SUM(LENGTH(value)) FROM writes"):
+        async with conn.execute(sql) as cur:
+            total += (await cur.fetchone())[0] or 0
+    return total
+
+
+async def main_async(turns: int, sessions: int) -> None:
+    results = {}
+
+    store: dict = {}
+    runs = [await _in_memory(turns, f"s{s}", store) for s in range(sessions)]
+    results["in-memory copy"] = (runs, None)
+
+    for name, state_type, delta in (("sqlite, full", FullState, False), ("sqlite, delta", AgentState, True)):
+        path = os.path.join(tempfile.mkdtemp(), "sessions.sqlite")
+        conn, saver = await _open_saver(path)
+        graph = _graph(state_type, saver)
+        runs = [await _checkpointed(graph, turns, f"s{s}", delta) for s in range(sessions)]
+        results[name] = (runs, await _stored_bytes(conn) / (turns * sessions))
+        await conn.close()
+
+    print(f"{'strategy':<16}{'turns 1-10 ms':>15}{'turns -10 ms':>15}{'KB/turn':>10}")
+    for name, (runs, per_turn) in results.items():
+        first = statistics.mean(t for r in runs for t in r[:10]) * 1000
+        last = statistics.mean(t for r in runs for t in r[-10:]) * 1000
+        kb = f"{per_turn / 1024:.1f}" if per_turn is not None else "-"
+        print(f"{name:<16}{first:>15.2f}{last:>15.2f}{kb:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--sessions", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.turns, args.sessions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Static page serving: StaticFiles/FileResponse vs the precompressed asset store.
+
+    python benchmarks/static_assets.py [--requests 500] [--mbps 1.6]
+
+Requests "/" and "/products" in-process (httpx ASGITransport, no network),
+as a browser would with ``Accept-Encoding: gzip, deflate, br``:
+
+  first load   – no validators
+  repeat load  – If-None-Match with the ETag from the first load
+
+Reports body bytes on the wire, the estimated transfer time on a slow link
+(``--mbps``, default a 3G-class 1.6 Mbit/s) and mean server-side latency.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException, Request  # noqa: E402
+from fastapi.responses import FileResponse  # noqa: E402
+from fastapi.staticfiles import StaticFiles  # noqa: E402
+
+from app.static_assets import AssetStore, brotli  # noqa: E402
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "..", "static")
+PAGES = ("/", "/products")
+ACCEPT = {"Accept-Encoding": "gzip, deflate, br"}
+
+
+def _old_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/products")
+    async def products_page():
+        return FileResponse(os.path.join(STATIC_DIR, "products.html"))
+
+    app.mount("/", StaticFiles(directory=STATIC_DIR, html=True), name="static")
+    return app
+
+
+def _new_app() -> FastAPI:
+    app = FastAPI()
+    store = AssetStore(STATIC_DIR)
+
+    @app.api_route("/{path:path}", methods=["GET", "HEAD"])
+    async def static_file(path: str, request: Request):
+        found = store.lookup(path)
+        if found is None:
+            raise HTTPException(status_code=404)
+        return store.response(request, *found)
+
+    return app
+
+
+async def _measure(app: FastAPI, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        etags, first_bytes, repeat_bytes, statuses = {}, 0, 0, set()
+        for page in PAGES:
+            r = await client.get(page, headers=ACCEPT)
+            first_bytes += r.num_bytes_downloaded
+            etags[page] = r.headers.get("etag")
+            r = await client.get(page, headers={**ACCEPT, "If-None-Match": etags[page] or ""})
+            repeat_bytes += r.num_bytes_downloaded
+            statuses.add(r.status_code)
+
+        timings = {"first": [], "repeat": []}
+        for _ in range(requests):
+            for page in PAGES:
+                t0 = time.perf_counter()
+                await client.get(page, headers=ACCEPT)
+                timings["first"].append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                await client.get(page, headers={**ACCEPT, "If-None-Match": etags[page] or ""})
+                timings["repeat"].append(time.perf_counter() - t0)
+
+    return {
+        "first_bytes": first_bytes,
+        "repeat_bytes": repeat_bytes,
+        "repeat_status": "/".join(str(s) for s in sorted(statuses)),
+        "first_ms": statistics.mean(timings["first"]) * 1000,
+        "repeat_ms": statistics.mean(timings["repeat"]) * 1000,
+    }
+
+
+async def main_async(requests: int, mbps: float) -> None:
+    if brotli is None:
+        print("brotli not installed – new store serves gzip only\n")
+    results = {
+        "StaticFiles": await _measure(_old_app(), requests),
+        "asset store": await _measure(_new_app(), requests),
+    }
+    print(
+        f"{'server':<13}{'first KB':>10}{'link ms':>9}{'server ms':>11}"
+        f"{'repeat KB':>11}{'status':>8}{'server ms':>11}"
+    )
+    for name, r in results.items():
+        link_ms = r["first_bytes"] * 8 / (mbps * 1_000_000) * 1000
+        print(
+            f"{name:<13}{r['first_bytes'] / 1024:>10.1f}{link_ms:>9.0f}{r['first_ms']:>11.2f}"
+            f"{r['repeat_bytes'] / 1024:>11.1f}{r['repeat_status']:>8}{r['repeat_ms']:>11.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--mbps", type=float, default=1.6)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.mbps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Per-turn transport overhead: SSE (POST /api/chat) vs WebSocket (/api/ws).
+
+    python benchmarks/transport_overhead.py [--turns 50] [--tokens 150]
+
+Runs the real app under uvicorn on localhost with a stub model that answers
+every turn instantly – one search_products call, then ``--tokens`` streamed
+tokens – so only transport and framing costs differ.  Traffic goes through
+a byte-counting TCP proxy:
+
+  SSE           one POST per turn on a keep-alive connection
+  WS json       one connection for all turns, JSON text frames
+  WS compact    the chat.compact subprotocol (tokens as binary frames)
+
+Each WebSocket mode is run without and with permessage-deflate (browsers
+negotiate it by default).  The WebSocket handshake is reported separately,
+since it is paid once per connection rather than per turn.  ``first token``
+is the mean time from sending the message to receiving the first token.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["SESSION_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "sessions.sqlite")
+os.environ["FAST_PATH_ENABLED"] = "false"
+os.environ["SPECULATIVE_RETRIEVAL"] = "false"
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, AIMessageChunk  # noqa: E402
+from langchain_core.outputs import ChatGenerationChunk  # noqa: E402
+from websockets.asyncio.client import connect  # noqa: E402
+
+import app.agent.graph as agent_graph  # noqa: E402
+
+TOKENS = 150
+_WORDS = ["The", " Lenovo", " Legion", " 5", " has", " an", " RTX", " 4060", ",", " 16", " GB", " of", " RAM"]
+
+
+class _StubModel(GenericFakeChatModel):
+    """Searches the catalog once, then streams a fixed-length answer."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        if messages[-1].type == "human":
+            chunks = [AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "search_products", "args": '{"query": "gaming laptop"}', "id": "call_1", "index": 0}
+            ])]
+        else:
+            chunks = [AIMessageChunk(content=word) for word in itertools.islice(itertools.cycle(_WORDS), TOKENS)]
+        for message in chunks:
+            chunk = ChatGenerationChunk(message=message)
+            if run_manager and message.content:
+                await run_manager.on_llm_new_token(message.content, chunk=chunk)
+            yield chunk
+
+
+agent_graph.ChatOpenAI = lambda **kwargs: _StubModel(messages=itertools.repeat(AIMessage(content="")))
+
+import app.main as main  # noqa: E402
+
+
+class _CountingProxy:
+    """TCP proxy that counts the bytes flowing each way."""
+
+    def __init__(self, upstream_port: int):
+        self.upstream_port = upstream_port
+        self.sent = self.received = 0
+
+    def reset(self) -> tuple[int, int]:
+        counts = (self.sent, self.received)
+        self.sent = self.received = 0
+        return counts
+
+    async def _pipe(self, reader, writer, upstream: bool) -> None:
+        try:
+            while data := await reader.read(65536):
+                if upstream:
+                    self.sent += len(data)
+                else:
+                    self.received += len(data)
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer) -> None:
+        server_reader, server_writer = await asyncio.open_connection("127.0.0.1", self.upstream_port)
+        await asyncio.gather(
+            self._pipe(client_reader, server_writer, upstream=True),
+            self._pipe(server_reader, client_writer, upstream=False),
+            return_exceptions=True,
+        )
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _sse_turns(port: int, turns: int) -> list[float]:
+    first_token = []
+    session_id = None
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+        for _ in range(turns):
+            started = time.perf_counter()
+            seen = False
+            body = {"message": "any gaming laptops?", "session_id": session_id}
+            async with client.stream("POST", "/api/chat", json=body) as response:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    event = json.loads(line[6:])
+                    if event["type"] == "token" and not seen:
+                        first_token.append(time.perf_counter() - started)
+                        seen = True
+                    elif event["type"] == "done":
+                        session_id = event["session_id"]
+    return first_token
+
+
+async def _ws_turns(port: int, turns: int, subprotocol: str, deflate: bool, proxy: _CountingProxy):
+    first_token = []
+    session_id = None
+    async with connect(
+        f"ws://127.0.0.1:{port}/api/ws",
+        subprotocols=[subprotocol],
+        compression="deflate" if deflate else None,
+    ) as ws:
+        handshake = proxy.reset()
+        for _ in range(turns):
+            started = time.perf_counter()
+            seen = False
+            await ws.send(json.dumps({"type": "chat", "message": "any gaming laptops?", "session_id": session_id}))
+            while True:
+                frame = await ws.recv()
+                event = {"type": "token"} if isinstance(frame, bytes) else json.loads(frame)
+                if event["type"] == "token" and not seen:
+                    first_token.append(time.perf_counter() - started)
+                    seen = True
+                elif event["type"] == "done":
+                    session_id = event["session_id"]
+                    break
+        counts = proxy.reset()
+    return first_token, handshake, counts
+
+
+async def main_async(turns: int) -> None:
+    upstream = _free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, port=upstream, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while main.graph is None or not server.started:
+        await asyncio.sleep(0.1)
+
+    proxy = _CountingProxy(upstream)
+    port = await proxy.start()
+    rows = {}
+
+    await _sse_turns(port, 2)  # warm up
+    proxy.reset()
+    started = time.perf_counter()
+    first_token = await _sse_turns(port, turns)
+    elapsed = time.perf_counter() - started
+    rows["SSE"] = (None, proxy.reset(), first_token, elapsed)
+
+    for deflate in (False, True):
+        for subprotocol in ("chat.json", "chat.compact"):
+            name = f"WS {subprotocol.split('.')[1]}" + (" +deflate" if deflate else "")
+            started = time.perf_counter()
+            first_token, handshake, counts = await _ws_turns(port, turns, subprotocol, deflate, proxy)
+            rows[name] = (handshake, counts, first_token, time.perf_counter() - started)
+
+    print(f"{turns} turns × ({TOKENS} tokens + 1 tool call)\n")
+    print(f"{'transport':<20}{'up B/turn':>10}{'down B/turn':>12}{'handshake B':>13}{'first token ms':>16}{'turn ms':>9}")
+    for name, (handshake, (sent, received), first_token, elapsed) in rows.items():
+        print(
+            f"{name:<20}{sent / turns:>10.0f}{received / turns:>12.0f}"
+            f"{sum(handshake) if handshake else 0:>13}"
+            f"{statistics.mean(first_token) * 1000:>16.2f}{elapsed / turns * 1000:>9.2f}"
+        )
+
+    server.should_exit = True
+    thread.join()
+
+
+def main_cli() -> None:
+    global TOKENS
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=TOKENS)
+    args = parser.parse_args()
+    TOKENS = args.tokens
+    asyncio.run(main_async(args.turns))
+
+
+if __name__ == "__main__":
+    main_cli()